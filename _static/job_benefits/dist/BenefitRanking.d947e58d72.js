@@ -0,0 +1,50 @@
+// job_benefits/BenefitRanking
+document.addEventListener('DOMContentLoaded', function() {
+    const sortableList = document.getElementById('sortable-list');
+    const rankingInput = document.getElementById('id_benefit_ranking');
+
+    // --- NEW: Function to update the visible rank numbers ---
+    function updateRankNumbers() {
+        const benefitTiles = sortableList.querySelectorAll('.benefit-tile');
+        benefitTiles.forEach((tile, index) => {
+            const rankSpan = tile.querySelector('.rank-number');
+            if (rankSpan) {
+                // Set the text content to the current rank (index + 1)
+                rankSpan.textContent = index + 1;
+            }
+        });
+    }
+
+    // Function to update the hidden input field with the current order
+    function updateRankingInput() {
+        const benefitTiles = sortableList.querySelectorAll('.benefit-tile');
+        // One character per benefit, validated server-side (see encode_ranking)
+        const currentRanking = Array.from(benefitTiles).map(tile => tile.dataset.benefitCode);
+        rankingInput.value = currentRanking.join('');
+    }
+
+    // Set the initial state, so the page submits a valid ranking without any drag
+    updateRankingInput();
+    updateRankNumbers(); // --- NEW: Set initial numbers on page load
+
+    function onReorder() {
+        updateRankingInput();
+        updateRankNumbers();
+    }
+
+    // Initialize the SortableJS library on our list
+    new Sortable(sortableList, {
+        animation: 150,
+        ghostClass: 'sortable-ghost',
+        chosenClass: 'sortable-chosen',
+        handle: '.drag-handle',
+        // This function is called when the user finishes dragging an item
+        onEnd: onReorder
+    });
+
+    // Ensure the ranking is updated right before the form submits, as a fallback
+    const form = document.querySelector('form');
+    form.addEventListener('submit', function() {
+        updateRankingInput();
+    });
+});
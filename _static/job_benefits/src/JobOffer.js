@@ -0,0 +1,21 @@
+// job_benefits/JobOffer (Choice treatment only)
+document.addEventListener('DOMContentLoaded', function () {
+    const gymChoiceRadios = document.querySelectorAll('input[name="gym_choice"]');
+    const bikeChoiceBlock = document.getElementById('bike-choice-block');
+
+    // Function to show the bike choice block
+    function showBikeChoice() {
+        bikeChoiceBlock.style.display = 'block';
+    }
+
+    // Add event listener to each radio button in the gym choice group
+    gymChoiceRadios.forEach(radio => {
+        radio.addEventListener('change', showBikeChoice);
+    });
+
+    // If a choice was already made (e.g., on a page reload after an error), show the block
+    const checkedGymRadio = document.querySelector('input[name="gym_choice"]:checked');
+    if (checkedGymRadio) {
+        showBikeChoice();
+    }
+});
@@ -0,0 +1,128 @@
+// job_benefits/JobSelection
+document.addEventListener('DOMContentLoaded', function() {
+    // This variable now holds the dynamically generated job packages for this specific participant
+    const jobScriptData = window.jobScriptData;
+    const modal = document.getElementById('job-modal');
+
+    // Find the oTree-generated form
+    const form = document.querySelector('form');
+
+    const chosenPackageInput = document.getElementById('chosen_job_package_index_input');
+    const timeLogInput = document.getElementById('modal_time_log_input');
+    const backBtn = document.getElementById('modal-back-btn');
+
+    let timeLog = {};
+    let modalOpenTime;
+    let currentlyOpenJobIndex; // Use the tile's index as a reliable key
+
+    // Tile events are buffered and sent to the server in batches through live_method,
+    // so they survive an abandoned tab without costing one request per event.
+    const EVENT_FLUSH_SIZE = 20;
+    const EVENT_FLUSH_INTERVAL_MS = 3000;
+    let eventBuffer = [];
+
+    function recordEvent(kind, tileIndex) {
+        eventBuffer.push([kind, Number(tileIndex), Math.round(performance.now())]);
+        if (eventBuffer.length >= EVENT_FLUSH_SIZE) {
+            flushEvents();
+        }
+    }
+
+    function flushEvents() {
+        if (eventBuffer.length === 0 || typeof liveSend !== 'function') return;
+        liveSend({events: eventBuffer});
+        eventBuffer = [];
+    }
+
+    setInterval(flushEvents, EVENT_FLUSH_INTERVAL_MS);
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') {
+            flushEvents();
+        }
+    });
+
+    function openModal(packageIndex) {
+        // --- MODIFIED LOGIC STARTS HERE ---
+        const jobData = jobScriptData[packageIndex];
+        currentlyOpenJobIndex = packageIndex;
+
+        chosenPackageInput.value = packageIndex;
+
+        document.getElementById('modal-title').textContent = jobData.title;
+        document.getElementById('modal-wage').textContent = `€${jobData.wage}`;
+
+        const benefitsList = document.getElementById('modal-benefits');
+        benefitsList.innerHTML = ''; // Clear previous benefits
+
+        // The new data structure has 'benefits_summary', which is a list. We loop through it.
+        jobData.benefits_summary.forEach(benefitName => {
+            const li = document.createElement('li');
+            // We get the detailed description from the 'benefit_details' dictionary
+            const benefitDescription = jobData.benefit_details[benefitName] || 'Details not available.';
+            li.innerHTML = `<strong>${benefitName}:</strong> ${benefitDescription}`;
+            benefitsList.appendChild(li);
+        });
+        // --- MODIFIED LOGIC ENDS HERE ---
+
+        modalOpenTime = performance.now();
+        recordEvent('o', packageIndex);
+        modal.style.display = 'block';
+    }
+
+    // This time-keeping logic remains unchanged and will work correctly.
+    function logTime() {
+        if (!modalOpenTime || currentlyOpenJobIndex === null) return;
+
+        recordEvent('c', currentlyOpenJobIndex);
+        const timeElapsed = Math.round(performance.now() - modalOpenTime);
+        // Use the index as the key for the time log to handle any potential duplicate titles
+        const logKey = `Tile Index ${currentlyOpenJobIndex}`;
+
+        if (timeLog[logKey]) {
+            timeLog[logKey] += timeElapsed;
+        } else {
+            timeLog[logKey] = timeElapsed;
+        }
+        modalOpenTime = null; 
+        currentlyOpenJobIndex = null;
+    }
+
+    function closeModal() {
+        logTime();
+        modal.style.display = 'none';
+    }
+
+    document.querySelectorAll('.package-tile').forEach(tile => {
+        tile.addEventListener('click', function() {
+            openModal(this.dataset.index);
+        });
+        tile.addEventListener('mouseenter', function() {
+            recordEvent('h', this.dataset.index);
+        });
+    });
+
+    backBtn.addEventListener('click', function() {
+        closeModal();
+        chosenPackageInput.value = ''; // Clear choice when going back
+    });
+
+    window.addEventListener('click', function(event) {
+        if (event.target == modal) {
+            closeModal();
+            chosenPackageInput.value = ''; // Clear choice if clicked outside
+        }
+    });
+
+    // The form submission logic remains unchanged.
+    form.addEventListener('submit', function(event) {
+        logTime();
+        flushEvents();
+
+        timeLogInput.value = JSON.stringify(timeLog);
+
+        if (chosenPackageInput.value === '') {
+            event.preventDefault(); // Stop the form from submitting
+            alert('Your choice was cleared. Please select a package again and click "Confirm Choice".');
+        }
+    });
+});
@@ -1,7 +1,22 @@
 import logging
 from otree.api import *
+from otree.database import dbq
+import os
 import random
 import json
+from pathlib import Path
+
+from .catalog import load_catalog
+from .columnar import results_enabled, write_results_record
+from .profiling import profiled
+from .storage import apply_from_environment as apply_storage_profile
+from .warmup import warm_up
+
+apply_storage_profile()
+
+# Set JOB_BENEFITS_SINGLE_ROUND=1 to present the three treatments as JobOffer steps
+# inside one round, with one Player row per participant instead of one per treatment
+SINGLE_ROUND = os.environ.get('JOB_BENEFITS_SINGLE_ROUND', '') not in ('', '0')
 
 # =============================================================================
 # 1. MODELS
@@ -10,7 +25,7 @@ import json
 class Constants(BaseConstants):
     name_in_url = 'job_benefits'
     players_per_group = None
-    num_rounds = 3  # Three rounds
+    num_rounds = 1 if SINGLE_ROUND else 3  # Three rounds, one per treatment
 
     TREATMENTS = ['Cash Bonus', 'Non-Monetary Perk', 'Choice']
 
@@ -88,27 +103,219 @@ class Constants(BaseConstants):
         ),
     ]
 
+
+# Validated once here, so catalog mistakes fail at startup instead of mid-session.
+# Set JOB_BENEFITS_CATALOG to a JSON file to run a variant of the catalog.
+CATALOG = load_catalog(os.environ.get('JOB_BENEFITS_CATALOG'), Constants)
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / '_static'
+STATIC_URL_PREFIX = '/static/'
+# Built by tools/build_images.py and tools/build_assets.py; paths in them are relative to _static/
+IMAGE_MANIFEST_PATH = STATIC_DIR / 'global' / 'img' / 'manifest.json'
+ASSET_MANIFEST_PATH = STATIC_DIR / 'job_benefits' / 'dist' / 'manifest.json'
+SORTABLE_VENDOR_FILE = 'job_benefits/vendor/Sortable-1.15.2.js'
+# The images fill the content column: 100vw minus page and card padding, capped at 640px
+IMAGE_SIZES = '(max-width: 740px) calc(100vw - 100px), 640px'
+
+
+def read_static_manifest(path):
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        logging.getLogger(__name__).warning("%s not found, serving unbuilt static files", path)
+        return {}
+
+
+def load_responsive_images(fallbacks):
+    """
+    Template context for each image: srcset strings per format plus a fallback src.
+    If the manifest hasn't been built, the original file is used on its own.
+    """
+    manifest = read_static_manifest(IMAGE_MANIFEST_PATH)
+    images = {}
+    for name, original in fallbacks.items():
+        entry = manifest.get(name)
+        if entry is None:
+            images[name] = dict(
+                src=STATIC_URL_PREFIX + original,
+                srcset_avif='', srcset_webp='', srcset_jpeg='', sizes='', width=None, height=None,
+            )
+            continue
+        srcsets = {
+            fmt: ', '.join(f'{STATIC_URL_PREFIX}{path} {width}w' for path, width in variants)
+            for fmt, variants in entry['variants'].items()
+        }
+        images[name] = dict(
+            src=STATIC_URL_PREFIX + entry['fallback'],
+            srcset_avif=srcsets['avif'],
+            srcset_webp=srcsets['webp'],
+            srcset_jpeg=srcsets['jpeg'],
+            sizes=IMAGE_SIZES,
+            width=entry['width'],
+            height=entry['height'],
+        )
+    return images
+
+
+RESPONSIVE_IMAGES = load_responsive_images({
+    'gym': 'global/gym.jpg',
+    'work_bike': 'global/work_bike.jpg',
+})
+
+
+def load_asset_urls():
+    """
+    URL of each page bundle by logical name ('JobOffer.css'). Without a built
+    manifest the sources in _static/job_benefits/src/ and vendor/ are served.
+    """
+    manifest = read_static_manifest(ASSET_MANIFEST_PATH)
+    urls = {
+        source.name: STATIC_URL_PREFIX + manifest.get(source.name, f'job_benefits/src/{source.name}')
+        for source in (STATIC_DIR / 'job_benefits' / 'src').iterdir()
+    }
+    urls['sortable.js'] = STATIC_URL_PREFIX + manifest.get('sortable.js', SORTABLE_VENDOR_FILE)
+    return urls
+
+
+ASSET_URLS = load_asset_urls()
+
+
+def page_assets(page_name):
+    """Bundle URLs for one page's template: page_css, and page_js if the page has a script."""
+    return dict(
+        page_css=ASSET_URLS[f'{page_name}.css'],
+        page_js=ASSET_URLS.get(f'{page_name}.js', ''),
+    )
+
+
+def williams_design(n):
+    """
+    Balanced Latin square (Williams design) over n conditions, as lists of indexes.
+    Every condition appears once per position and follows every other condition
+    equally often. For odd n the mirrored square is appended, giving 2n sequences.
+    """
+    first_row = [0]
+    low, high = 1, n - 1
+    while len(first_row) < n:
+        first_row.append(low)
+        low += 1
+        if len(first_row) < n:
+            first_row.append(high)
+            high -= 1
+    rows = [[(c + r) % n for c in first_row] for r in range(n)]
+    if n % 2:
+        rows += [row[::-1] for row in rows]
+    return rows
+
+
+def build_assignment(seed):
+    """
+    The whole session's counterbalancing, derived from one seed: the Latin-square
+    treatment orders in a seeded cell order, plus the offset of the perk schedule.
+    Stored in session.vars; participants are mapped onto it by position.
+    """
+    rng = random.Random(seed)
+    orders = williams_design(len(Constants.TREATMENTS))
+    rng.shuffle(orders)
+    return dict(
+        seed=seed,
+        orders=orders,
+        perk_offset=rng.randrange(len(Constants.NON_MONETARY_PERKS)),
+    )
+
+
+def assigned_treatment_order(assignment, id_in_subsession):
+    """Consecutive participants cycle through the orders, so cells stay balanced."""
+    orders = assignment['orders']
+    order = orders[(id_in_subsession - 1) % len(orders)]
+    return [Constants.TREATMENTS[i] for i in order]
+
+
+def assigned_perk(assignment, id_in_subsession):
+    """Perks alternate between successive passes through the orders, so each cell gets both."""
+    num_orders = len(assignment['orders'])
+    perks = Constants.NON_MONETARY_PERKS
+    return perks[((id_in_subsession - 1) // num_orders + assignment['perk_offset']) % len(perks)]
+
+
+@profiled
 class Subsession(BaseSubsession):
     def creating_session(self):
         """
-        This method runs at the start of each round. The corrected logic ensures
-        that the treatment order is created for a participant if it doesn't exist,
-        and then assigns the current round's treatment from that order.
-        This robustly handles all rounds and players joining mid-session.
+        The assignment is generated once in round 1 from the session's seed
+        (session config 'assignment_seed', or a fresh random one recorded in
+        session.vars), then each round looks players up by position. Nothing is
+        drawn later, so refreshing a page never changes a treatment or perk.
         """
+        if self.round_number == 1:
+            seed = self.session.config.get('assignment_seed')
+            if seed is None:
+                seed = random.SystemRandom().randrange(2 ** 32)
+            self.session.vars['assignment'] = build_assignment(seed)
+            create_session_stats(self)
+        assignment = self.session.vars['assignment']
+
+        # id_in_subsession is stable across rounds (there is no regrouping),
+        # so no participant rows need to be loaded here.
         for p in self.get_players():
-            # Step 1: Check if the treatment order has been created for this participant.
-            # If not, create and shuffle it for them. This will run in Round 1
-            # for all players, and also for any player joining a session late.
-            if 'treatment_order' not in p.participant.vars:
-                treatments = list(Constants.TREATMENTS)
-                random.shuffle(treatments)
-                p.participant.vars['treatment_order'] = treatments
-            # Step 2: Now that we have guaranteed 'treatment_order' exists, we can
-            # safely retrieve the order and assign the treatment for the current round.
-            # The round_number is 1-based, list index is 0-based, so we subtract 1.
-            treatment_order = p.participant.vars['treatment_order']
-            p.treatment = treatment_order[self.round_number - 1]
+            order = assigned_treatment_order(assignment, p.id_in_subsession)
+            if SINGLE_ROUND:
+                p.treatment_order = ','.join(order)
+                p.perk_offered = assigned_perk(assignment, p.id_in_subsession)
+                continue
+            p.treatment = order[self.round_number - 1]
+            if p.treatment == 'Non-Monetary Perk':
+                p.perk_offered = assigned_perk(assignment, p.id_in_subsession)
+
+    def vars_for_admin_report(self):
+        """
+        Live monitor built from the session's SessionStat rows, so it costs the
+        same whether 10 or 10,000 participants have submitted. Numbers are
+        formatted here for admin_report.html.
+        """
+        stats = session_stats(self.in_round(1))
+        num_benefits = len(CATALOG.benefit_names)
+        num_choices = sum(stats[f'package:{i}'].count for i in range(4))
+
+        acceptance = []
+        for treatment in Constants.TREATMENTS:
+            stat = stats[f'accept:{treatment}']
+            acceptance.append(dict(treatment=treatment, offers=stat.count, accepted=round(stat.total), rate=f'{stat.mean:.2f}'))
+
+        choices = [
+            dict(item=item, **{option: stats[f'choice:{item}:{option}'].count for option in CHOICE_OPTIONS})
+            for item in ('gym', 'bike')
+        ]
+
+        wtp = []
+        for item in ('gym', 'bike'):
+            stat = stats[f'wtp:{item}']
+            sd = stat_sd(stat)
+            wtp.append(dict(item=item, n=stat.count, mean=f'{stat.mean:.1f}', sd='-' if sd is None else f'{sd:.1f}'))
+
+        # Borda count: in a ranking of n benefits, the k-th place scores n - k points
+        borda = []
+        for name in CATALOG.benefit_names:
+            stat = stats[f'borda:{name}']
+            borda.append(dict(benefit=name, score=round(stat.total), max_score=stat.count * (num_benefits - 1)))
+        borda.sort(key=lambda row: -row['score'])
+
+        packages = []
+        for i in range(4):
+            count = stats[f'package:{i}'].count
+            packages.append(dict(index=i, count=count, share=f'{count / num_choices:.2f}' if num_choices else '-'))
+
+        return dict(acceptance=acceptance, choices=choices, wtp=wtp, borda=borda, packages=packages)
+
+
+# oTree looks these hooks up on the module in apps laid out as a single __init__.py
+def creating_session(subsession):
+    subsession.creating_session()
+
+
+def vars_for_admin_report(subsession):
+    return subsession.vars_for_admin_report()
+
 
 class Group(BaseGroup):
     pass
@@ -138,8 +345,9 @@ class Player(BasePlayer):
     )
 
     # --- NEW ---
-    # Field to store the benefit ranking. It will be a comma-separated string from the JS widget.
-    benefit_ranking = models.LongStringField(blank=True)
+    # Field to store the benefit ranking, best first, as one character per benefit
+    # (see encode_ranking). Rows from before this encoding hold comma-separated names.
+    benefit_ranking = models.StringField(blank=True)
 
     treatment = models.StringField()
     accept_offer = models.BooleanField(label="Do you accept this job offer?", blank=True)
@@ -154,92 +362,480 @@ class Player(BasePlayer):
         widget=widgets.RadioSelect,
         blank=True
     )
+
+    # --- Single-round mode: the treatments in the order shown, and the answer of
+    # each yes/no treatment. Choice answers go to gym_choice/bike_choice as usual.
+    treatment_order = models.StringField(blank=True)
+    accept_cash_offer = models.BooleanField(label="Do you accept this job offer?", blank=True)
+    accept_perk_offer = models.BooleanField(label="Do you accept this job offer?", blank=True)
     
-    # This field now stores the index of the chosen package from Constants.JOB_TILES
+    # This field now stores the index of the chosen package from get_dynamic_job_packages
     chosen_job_package_index = models.IntegerField(
         label="Please choose your preferred job package.",
         blank=True
     )
     modal_time_log = models.StringField(blank=True)
 
-    def get_dynamic_job_packages(self):
+    def get_dynamic_job_packages(self, snapshot=None):
         """
         Generates the personalized list of 4 job packages based on this player's
         ranking and preferences from round 1. This function can be called from any page.
+
+        The result is memoized in participant.vars, keyed on the round-1 inputs it
+        depends on, so JobSelection and ResultsSummary render the exact same list
+        without going back to the database. Pass the page's ParticipantSnapshot to
+        reuse its rows if the inputs have to be read again.
         """
-        player_in_round_1 = self.in_round(1)
+        inputs = job_package_inputs(self, snapshot)
 
-        # Get the participant's ranking and preferred salary from round 1
-        ranked_benefits_str = player_in_round_1.field_maybe_none('benefit_ranking')
-        # Use a sensible default for salary if not provided
-        preferred_salary = player_in_round_1.field_maybe_none('preferred_salary') or Constants.BASE_SALARY
-        
-        # Use WTP as the "Numéraire" for salary sacrifice
-        wtp_sum = (player_in_round_1.field_maybe_none('willingness_to_pay_gym') or 0) + \
-                  (player_in_round_1.field_maybe_none('willingness_to_pay_bike') or 0)
-
-        # Get the preferred job title
-        preferred_job_index = player_in_round_1.field_maybe_none('chosen_job_tile')
-        chosen_title = "General Position"
-        if preferred_job_index is not None and preferred_job_index < len(Constants.JOB_TILES):
-            chosen_title = Constants.JOB_TILES[preferred_job_index]['title']
-        
-        job_packages = []
-        
-        # Fallback in case ranking data is missing
-        if not ranked_benefits_str:
-            # You can define a more robust fallback here if needed
-            return [] 
-        
-        # Create the personalized tiers
-        ranked_benefits = ranked_benefits_str.split(',')
-        
-        tier1_salary = preferred_salary
-        tier4_salary = max(0, preferred_salary - wtp_sum)
-        salary_step = (tier1_salary - tier4_salary) / 3 if wtp_sum > 0 else 0
-        
-        salaries = [
-            round(tier1_salary),
-            round(tier1_salary - salary_step),
-            round(tier1_salary - 2 * salary_step),
-            round(tier4_salary)
-        ]
-        
-        num_ranked = len(ranked_benefits)
-        if num_ranked < 4: # Add a safeguard for very short rankings
-            return []
-
-        benefit_tiers = [
-            ranked_benefits[0],
-            ranked_benefits[1],
-            ranked_benefits[num_ranked - 3],
-            ranked_benefits[num_ranked - 2],
-        ]
-        
-        # Build the 4 personalized job tiles
-        for i in range(4):
-            benefit_name = benefit_tiers[3-i]
-            job_packages.append({
-                'title': chosen_title,
-                'wage': salaries[i],
-                'benefits_summary': [benefit_name], # Inversely matched
-                'index': i,
-                'benefit_details': {
-                    benefit_name: Constants.BENEFIT_DESCRIPTIONS.get(benefit_name, '')
-                }
-            })
-        
+        cache = self.participant.vars.get('job_packages_cache')
+        if cache is not None and tuple(cache['key']) == inputs:
+            return cache['packages']
+
+        job_packages = build_job_packages(*inputs)
+        self.participant.vars['job_packages_cache'] = dict(key=inputs, packages=job_packages)
         return job_packages
 
 
+class TileEvent(ExtraModel):
+    """One JobSelection tile event, sent in batches through JobSelection.live_method."""
+    player = models.Link(Player)
+    kind = models.StringField()  # 'o' open, 'c' close, 'h' hover
+    tile = models.IntegerField()
+    t_ms = models.IntegerField()  # performance.now() on the participant's page
+
+
+TILE_EVENT_KINDS = ('o', 'c', 'h')
+# Upper bound per live message; the client flushes every 20 events
+MAX_TILE_EVENTS_PER_BATCH = 200
+
+
+def valid_tile_event(event):
+    if not (isinstance(event, list) and len(event) == 3):
+        return False
+    kind, tile, t_ms = event
+    return kind in TILE_EVENT_KINDS and type(tile) is int and 0 <= tile < 4 and type(t_ms) is int and t_ms >= 0
+
+
+def record_tile_events(player, events):
+    """
+    Stores a client batch of [kind, tile, t_ms] events with one bulk INSERT.
+    Malformed entries are dropped, and a batch longer than
+    MAX_TILE_EVENTS_PER_BATCH is dropped whole, before anything is written.
+    """
+    if not isinstance(events, list) or len(events) > MAX_TILE_EVENTS_PER_BATCH:
+        return
+    rows = [
+        dict(player_id=player.id, kind=kind, tile=tile, t_ms=t_ms)
+        for kind, tile, t_ms in filter(valid_tile_event, events)
+    ]
+    if rows:
+        # Same DB session (and transaction) as the rest of the live request
+        dbq(TileEvent).session.bulk_insert_mappings(TileEvent, rows)
+
+
+def summarize_tile_events(events):
+    """
+    Total open time per tile in ms from (kind, tile, t_ms) tuples in arrival order,
+    keyed like modal_time_log ('Tile Index 0'). An open without a matching close
+    (tab closed, page reloaded) is not counted.
+    """
+    totals = {}
+    open_tile = open_at = None
+    for kind, tile, t_ms in events:
+        if kind == 'o':
+            open_tile, open_at = tile, t_ms
+        elif kind == 'c' and tile == open_tile and t_ms >= open_at:
+            key = f'Tile Index {tile}'
+            totals[key] = totals.get(key, 0) + t_ms - open_at
+            open_tile = None
+    return totals
+
+
+def parse_time_log(value):
+    """
+    Per-tile ms from a submitted modal_time_log, or None unless it is a JSON
+    object of finite, non-negative numbers. The client sends it, so '[]' or '5'
+    must not reach the export or the results snapshot.
+    """
+    try:
+        data = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    for ms in data.values():
+        if type(ms) not in (int, float) or not 0 <= ms < float('inf'):
+            return None
+    return data
+
+
+def tile_dwell_times(player):
+    """Per-tile totals from the stored TileEvents of this player, or None if there are none."""
+    events = sorted(TileEvent.filter(player=player), key=lambda e: e.id)
+    if not events:
+        return None
+    return summarize_tile_events((e.kind, e.tile, e.t_ms) for e in events)
+
+
+def recorded_dwell_times(player):
+    """
+    Per-tile dwell times of the JobSelection player, or None. The submitted
+    modal_time_log comes first: the final 'c' event is sent as the page navigates
+    away, so it can arrive late or never. The TileEvents are only used when the
+    participant left without submitting.
+    """
+    time_log_data = player.field_maybe_none('modal_time_log')
+    if time_log_data:
+        return parse_time_log(time_log_data)
+    return tile_dwell_times(player)
+
+
+class SessionStat(ExtraModel):
+    """
+    One running aggregate of a session, e.g. 'wtp:gym' or 'accept:Choice'.
+    Rows are created with the session and updated in before_next_page as
+    participants submit; vars_for_admin_report only reads them.
+    """
+    subsession = models.Link(Subsession)  # always round 1
+    name = models.StringField()
+    count = models.IntegerField()
+    total = models.FloatField()
+    mean = models.FloatField()
+    m2 = models.FloatField()  # sum of squared deviations from the mean (Welford)
+
+
+CHOICE_OPTIONS = ('Cash', 'Benefit', 'Reject')
+# accept: observations are 1/0 per offer, so total = accepted and mean = acceptance rate
+SESSION_STAT_NAMES = (
+    [f'accept:{treatment}' for treatment in Constants.TREATMENTS]
+    + [f'choice:{item}:{option}' for item in ('gym', 'bike') for option in CHOICE_OPTIONS]
+    + ['wtp:gym', 'wtp:bike']
+    + [f'borda:{name}' for name in CATALOG.benefit_names]
+    + [f'package:{i}' for i in range(4)]
+)
+
+
+def create_session_stats(subsession_in_round_1):
+    return {
+        name: SessionStat.create(subsession=subsession_in_round_1, name=name, count=0, total=0, mean=0, m2=0)
+        for name in SESSION_STAT_NAMES
+    }
+
+
+def session_stats(subsession_in_round_1):
+    """The session's SessionStat rows by name, created if the session predates them."""
+    stats = {stat.name: stat for stat in SessionStat.filter(subsession=subsession_in_round_1)}
+    return stats or create_session_stats(subsession_in_round_1)
+
+
+def add_observation(stat, value):
+    """Welford's update: count, total, mean and m2 stay exact without keeping the values."""
+    stat.count += 1
+    stat.total += value
+    delta = value - stat.mean
+    stat.mean += delta / stat.count
+    stat.m2 += delta * (value - stat.mean)
+
+
+def stat_sd(stat):
+    """Sample standard deviation, None below two observations."""
+    if stat.count < 2:
+        return None
+    return (stat.m2 / (stat.count - 1)) ** 0.5
+
+
+def update_session_stats(player, observations):
+    """Adds (name, value) observations to the player's session aggregates."""
+    stats = session_stats(player.subsession.in_round(1))
+    for name, value in observations:
+        add_observation(stats[name], float(value))
+
+
+def offer_observations(player, step):
+    """Session stats observations for the JobOffer step the player just submitted."""
+    treatment = offer_treatment(player, step)
+    if treatment != 'Choice':
+        return [(f'accept:{treatment}', 1 if player.field_maybe_none(offer_form_fields(treatment)[0]) else 0)]
+    gym, bike = player.field_maybe_none('gym_choice'), player.field_maybe_none('bike_choice')
+    # Same rule as ResultsSummary: accepting either offer in either form counts
+    accepted = gym in ('Cash', 'Benefit') or bike in ('Cash', 'Benefit')
+    observations = [(f'accept:{treatment}', 1 if accepted else 0)]
+    for item, choice in (('gym', gym), ('bike', bike)):
+        if choice in CHOICE_OPTIONS:
+            observations.append((f'choice:{item}:{choice}', 1))
+    return observations
+
+
+def borda_observations(ranking):
+    ranked_benefits = decode_ranking(ranking)
+    return [(f'borda:{name}', len(ranked_benefits) - 1 - i) for i, name in enumerate(ranked_benefits)]
+
+
+# Player fields copied into each RoundView
+SNAPSHOT_FIELDS = (
+    'willingness_to_pay_gym',
+    'willingness_to_pay_bike',
+    'chosen_job_tile',
+    'preferred_salary',
+    'benefit_ranking',
+    'treatment',
+    'accept_offer',
+    'perk_offered',
+    'gym_choice',
+    'bike_choice',
+    'chosen_job_package_index',
+    'modal_time_log',
+    'treatment_order',
+    'accept_cash_offer',
+    'accept_perk_offer',
+)
+
+
+class RoundView:
+    """
+    Read-only copy of one round's Player row. Fields read like attributes and
+    are None when blank; field_maybe_none() is kept for code written against Player.
+    """
+    __slots__ = ('participant', 'round_number', '_values')
+
+    def __init__(self, player):
+        object.__setattr__(self, 'participant', player.participant)
+        object.__setattr__(self, 'round_number', player.round_number)
+        object.__setattr__(self, '_values', {name: player.field_maybe_none(name) for name in SNAPSHOT_FIELDS})
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"RoundView has no field '{name}'") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RoundView is read-only")
+
+    def field_maybe_none(self, name):
+        return getattr(self, name)
+
+
+class ParticipantSnapshot:
+    """
+    All of a participant's Player rows up to the current round, fetched with a
+    single in_all_rounds() query the first time a round is accessed.
+    """
+    __slots__ = ('_player', '_rounds')
+
+    def __init__(self, player):
+        self._player = player
+        self._rounds = None
+
+    @property
+    def rounds(self):
+        if self._rounds is None:
+            self._rounds = tuple(RoundView(p) for p in self._player.in_all_rounds())
+        return self._rounds
+
+    def round(self, round_number):
+        return self.rounds[round_number - 1]
+
+
+def record_job_package_inputs(player_in_round_1):
+    """
+    Stores the round-1 inputs of get_dynamic_job_packages in participant.vars.
+    Called whenever one of those fields is submitted, which also invalidates
+    any cached package list built from older values.
+    """
+    inputs = (
+        player_in_round_1.field_maybe_none('benefit_ranking'),
+        player_in_round_1.field_maybe_none('preferred_salary'),
+        player_in_round_1.field_maybe_none('willingness_to_pay_gym'),
+        player_in_round_1.field_maybe_none('willingness_to_pay_bike'),
+        player_in_round_1.field_maybe_none('chosen_job_tile'),
+    )
+    player_in_round_1.participant.vars['job_package_inputs'] = inputs
+    return inputs
+
+
+# Field holding each yes/no treatment's answer in single-round mode
+SINGLE_ROUND_ACCEPT_FIELDS = {'Cash Bonus': 'accept_cash_offer', 'Non-Monetary Perk': 'accept_perk_offer'}
+# Per-step values reported by offer_decisions(), besides step and treatment
+OFFER_DECISION_FIELDS = ('perk_offered', 'accept_offer', 'gym_choice', 'bike_choice')
+
+
+def offer_treatment(player, step):
+    """Treatment of JobOffer step 1-3: from treatment_order in single-round mode, else the round's."""
+    if SINGLE_ROUND:
+        return player.treatment_order.split(',')[step - 1]
+    return player.treatment
+
+
+def offer_form_fields(treatment):
+    if treatment == 'Choice':
+        return ['gym_choice', 'bike_choice']
+    if SINGLE_ROUND:
+        return [SINGLE_ROUND_ACCEPT_FIELDS[treatment]]
+    return ['accept_offer']
+
+
+def offer_decisions(rounds):
+    """
+    One dict per JobOffer step in the order shown (step, treatment and the
+    OFFER_DECISION_FIELDS), from a participant's Player rows or RoundViews.
+    Both modes give the same result, so reports and the export don't branch on it.
+    """
+    if not SINGLE_ROUND:
+        return [
+            dict(
+                step=p.round_number,
+                treatment=p.field_maybe_none('treatment'),
+                **{name: p.field_maybe_none(name) for name in OFFER_DECISION_FIELDS},
+            )
+            for p in rounds
+        ]
+    p = rounds[0]
+    order = p.field_maybe_none('treatment_order')
+    decisions = []
+    for step, treatment in enumerate(order.split(',') if order else [], start=1):
+        accept_field = SINGLE_ROUND_ACCEPT_FIELDS.get(treatment)
+        decisions.append(dict(
+            step=step,
+            treatment=treatment,
+            perk_offered=p.field_maybe_none('perk_offered') if treatment == 'Non-Monetary Perk' else None,
+            accept_offer=p.field_maybe_none(accept_field) if accept_field else None,
+            gym_choice=p.field_maybe_none('gym_choice') if treatment == 'Choice' else None,
+            bike_choice=p.field_maybe_none('bike_choice') if treatment == 'Choice' else None,
+        ))
+    return decisions
+
+
+def job_package_inputs(player, snapshot=None):
+    """
+    The round-1 inputs recorded by record_job_package_inputs, as a tuple in its
+    order. Sessions started before they were recorded on submit read round 1 once.
+    """
+    inputs = player.participant.vars.get('job_package_inputs')
+    if inputs is None:
+        player_in_round_1 = snapshot.round(1) if snapshot else player.in_round(1)
+        inputs = record_job_package_inputs(player_in_round_1)
+    return tuple(inputs)
+
+
+def cached_context(player, key, compute, *args):
+    """
+    Template context of a page, computed by compute(player, *args) on the first
+    render and stored in participant.vars under key. Refreshes and back-navigation
+    then get the same context without recomputing it or writing to Player rows.
+    Only the page's own data belongs here: asset URLs are added at render time.
+    """
+    contexts = player.participant.vars.get('page_contexts', {})
+    if key not in contexts:
+        # Reassigned rather than mutated in place, so the change to vars is saved
+        contexts = dict(contexts)
+        contexts[key] = compute(player, *args)
+        player.participant.vars['page_contexts'] = contexts
+    return contexts[key]
+
+
+def encode_ranking(benefit_names):
+    """Compact form of a ranking, e.g. '30125746' for 8 benefits."""
+    return ''.join(CATALOG.benefits[CATALOG.benefit_index[name]].code for name in benefit_names)
+
+
+def decode_ranking(value):
+    """
+    Benefit names, best first, from a stored benefit_ranking. Values written before
+    the compact encoding (comma-separated names) are passed through unchanged.
+    """
+    if not value:
+        return []
+    codes = CATALOG.ranking_codes
+    if any(char not in codes for char in value):
+        return value.split(',')
+    return [CATALOG.benefit_names[codes.index(char)] for char in value]
+
+
+def ranking_error_message(value):
+    """None if value ranks every benefit exactly once, else an error for the form."""
+    codes = CATALOG.ranking_codes
+    if not value or len(value) != len(codes) or set(value) != set(codes):
+        return "Please rank all of the benefits before continuing."
+
+
+def build_job_packages(ranked_benefits_str, preferred_salary, wtp_gym, wtp_bike, preferred_job_index):
+    """
+    Builds the 4 personalized job packages from the round-1 inputs.
+    Pure function: it does not touch the database.
+    """
+    # Use a sensible default for salary if not provided
+    preferred_salary = preferred_salary or Constants.BASE_SALARY
+
+    # Use WTP as the "Numéraire" for salary sacrifice
+    wtp_sum = (wtp_gym or 0) + (wtp_bike or 0)
+
+    # Get the preferred job title
+    chosen_title = CATALOG.job_title(preferred_job_index, "General Position")
+
+    job_packages = []
+
+    # Fallback in case ranking data is missing
+    if not ranked_benefits_str:
+        # You can define a more robust fallback here if needed
+        return []
+
+    # Create the personalized tiers
+    ranked_benefits = decode_ranking(ranked_benefits_str)
+
+    tier1_salary = preferred_salary
+    tier4_salary = max(0, preferred_salary - wtp_sum)
+    salary_step = (tier1_salary - tier4_salary) / 3 if wtp_sum > 0 else 0
+
+    salaries = [
+        round(tier1_salary),
+        round(tier1_salary - salary_step),
+        round(tier1_salary - 2 * salary_step),
+        round(tier4_salary)
+    ]
+
+    num_ranked = len(ranked_benefits)
+    if num_ranked < 4: # Add a safeguard for very short rankings
+        return []
+
+    benefit_tiers = [
+        ranked_benefits[0],
+        ranked_benefits[1],
+        ranked_benefits[num_ranked - 3],
+        ranked_benefits[num_ranked - 2],
+    ]
+
+    # Build the 4 personalized job tiles
+    for i in range(4):
+        benefit_name = benefit_tiers[3-i]
+        job_packages.append({
+            'title': chosen_title,
+            'wage': salaries[i],
+            'benefits_summary': [benefit_name], # Inversely matched
+            'index': i,
+            'benefit_details': {
+                benefit_name: CATALOG.descriptions.get(benefit_name, '')
+            }
+        })
+
+    return job_packages
+
+
 # =============================================================================
 # 2. PAGES
 # =============================================================================
 
+@profiled
 class Introduction(Page):
     def is_displayed(self):
         return self.round_number == 1
 
+    def vars_for_template(self):
+        # Prefetched here so ValuePerception renders from the browser cache
+        return dict(prefetch_images=list(RESPONSIVE_IMAGES.values()), **page_assets('Introduction'))
+
+@profiled
 class ValuePerception(Page):
     form_model = 'player'
     form_fields = ['willingness_to_pay_gym', 'willingness_to_pay_bike']
@@ -248,7 +844,22 @@ class ValuePerception(Page):
         # This ensures the page is only shown in the first round.
         return self.round_number == 1
 
+    def vars_for_template(self):
+        return dict(
+            gym_image=RESPONSIVE_IMAGES['gym'],
+            bike_image=RESPONSIVE_IMAGES['work_bike'],
+            **page_assets('ValuePerception'),
+        )
+
+    def before_next_page(self, timeout_happened):
+        record_job_package_inputs(self)
+        update_session_stats(self, [
+            ('wtp:gym', self.willingness_to_pay_gym),
+            ('wtp:bike', self.willingness_to_pay_bike),
+        ])
+
 # --- NEW PAGE ---
+@profiled
 class JobPreference(Page):
     """
     New page where participants select their preferred job title and salary.
@@ -262,15 +873,21 @@ class JobPreference(Page):
     
     def vars_for_template(self):
         return dict(
-            job_tiles=Constants.JOB_TILES
+            job_tiles=CATALOG.jobs,
+            **page_assets('JobPreference'),
         )
 
+    def before_next_page(self, timeout_happened):
+        record_job_package_inputs(self)
+
 # --- NEW PAGE ---
+@profiled
 class BenefitRanking(Page):
     """
     On this page, participants rank a list of non-monetary benefits.
     The page uses a JavaScript widget (e.g., SortableJS) to allow drag-and-drop ranking.
-    The order is saved into the hidden 'benefit_ranking' form field.
+    The order is saved into the hidden 'benefit_ranking' form field in the
+    compact encoding and validated against the catalog on submit.
     """
     form_model = 'player'
     form_fields = ['benefit_ranking']
@@ -280,71 +897,112 @@ class BenefitRanking(Page):
 
     def vars_for_template(self):
         """
-        This method now pre-processes the data in Python to make it easier for the template.
-        It combines the benefit names and descriptions into a single list of dictionaries.
+        The catalog's Benefit records (name, description, code) are built once at
+        import and passed to the template as they are.
         """
-        benefits_data = []
-        for benefit_name in Constants.BENEFITS_TO_RANK:
-            benefits_data.append({
-                'name': benefit_name,
-                'description': Constants.BENEFIT_DESCRIPTIONS.get(benefit_name, 'Description not found.')
-            })
-        
-        return {'benefits_data': benefits_data}
+        return dict(
+            benefits_data=CATALOG.benefits,
+            sortable_js=ASSET_URLS['sortable.js'],
+            **page_assets('BenefitRanking'),
+        )
+
+    def error_message(self, values):
+        return ranking_error_message(values['benefit_ranking'])
+
+    def before_next_page(self, timeout_happened):
+        record_job_package_inputs(self)
+        update_session_stats(self, borda_observations(self.benefit_ranking))
+
+
+def compute_job_offer(player, step):
+    """
+    The offer of JobOffer step 1-3 (the round number, outside single-round mode).
+    Reads only fields set in creating_session and the recorded round-1 inputs.
+    """
+    # Treatment and perk were assigned in creating_session
+    treatment = offer_treatment(player, step)
+    _, preferred_salary, wtp_gym, wtp_bike, chosen_job_index = job_package_inputs(player)
+
+    bonus_desc = ""
+    adjusted_salary = preferred_salary or Constants.BASE_SALARY
+
+    # Get the job title chosen in round 1
+    job_title = CATALOG.job_title(chosen_job_index, "General Position") # Default title
+
+    if treatment == 'Cash Bonus':
+        bonus_desc = f"Cash bonus of €{Constants.CASH_BONUS}"
+    elif treatment == 'Non-Monetary Perk':
+        perk = player.perk_offered
+        # The salary adjustment logic remains as it was
+        if perk == 'Gym Membership':
+            adjusted_salary -= wtp_gym
+        elif perk == 'Work Bike':
+            adjusted_salary -= wtp_bike
+        bonus_desc = f"Non-monetary perk: {perk}"
+    return dict(
+        job_title=job_title,
+        base_salary=adjusted_salary,
+        treatment=treatment,
+        bonus_desc=bonus_desc,
+        wtp_gym=wtp_gym,
+        wtp_bike=wtp_bike,
+        offer_step=step,
+    )
+
 
+def job_offer_context(player, step):
+    """Render path of JobOffer: the offer computed on the first GET, plus the page's assets."""
+    offer = cached_context(player, f'JobOffer:{step}', compute_job_offer, step)
+    return dict(offer, Constants=Constants, **page_assets('JobOffer'))
 
+
+@profiled
 class JobOffer(Page):
+    """
+    The offer under the round's treatment. In single-round mode this is the first
+    of three steps, followed by JobOffer2 and JobOffer3 in the same round.
+    """
     form_model = 'player'
 
     def get_form_fields(self):
-        # Ensure treatment order exists
-        if 'treatment_order' not in self.participant.vars:
-            treatments = list(Constants.TREATMENTS)
-            random.shuffle(treatments)
-            self.participant.vars['treatment_order'] = treatments
-        
-        # Dynamically set form fields based on the treatment for the current round
-        treatment = self.participant.vars['treatment_order'][self.round_number - 1]
-        if treatment == 'Choice':
-            return ['gym_choice', 'bike_choice']
-        else:
-            return ['accept_offer']
+        # Dynamically set form fields based on the treatment assigned for this round or step
+        return offer_form_fields(offer_treatment(self, self.round_number))
 
     def vars_for_template(self):
-        treatment = self.participant.vars['treatment_order'][self.round_number - 1]
-        self.treatment = treatment  # Store treatment for the record
-
-        bonus_desc = ""
-        player_in_round_1 = self.in_round(1)
-        adjusted_salary = player_in_round_1.preferred_salary or Constants.BASE_SALARY
-
-        # Get the job title chosen in round 1
-        chosen_job_index = player_in_round_1.field_maybe_none('chosen_job_tile')
-        job_title = "General Position" # Default title
-        if chosen_job_index is not None:
-            job_title = Constants.JOB_TILES[chosen_job_index]['title']
-
-        if treatment == 'Cash Bonus':
-            bonus_desc = f"Cash bonus of €{Constants.CASH_BONUS}"
-        elif treatment == 'Non-Monetary Perk':
-            perk = random.choice(Constants.NON_MONETARY_PERKS)
-            self.perk_offered = perk
-            # The salary adjustment logic remains as it was
-            if perk == 'Gym Membership':
-                adjusted_salary -= player_in_round_1.willingness_to_pay_gym
-            elif perk == 'Work Bike':
-                adjusted_salary -= player_in_round_1.willingness_to_pay_bike
-            bonus_desc = f"Non-monetary perk: {perk}"
-        return dict(
-            job_title=job_title,
-            base_salary=adjusted_salary,
-            treatment=treatment,
-            bonus_desc=bonus_desc,
-            wtp_gym=player_in_round_1.willingness_to_pay_gym,
-            wtp_bike=player_in_round_1.willingness_to_pay_bike,
-            Constants=Constants
-        )
+        return job_offer_context(self, self.round_number)
+
+    def before_next_page(self, timeout_happened):
+        update_session_stats(self, offer_observations(self, self.round_number))
+
 
+@profiled
+class JobOffer2(JobOffer):
+    template_name = 'job_benefits/JobOffer.html'
+
+    def get_form_fields(self):
+        return offer_form_fields(offer_treatment(self, 2))
+
+    def vars_for_template(self):
+        return job_offer_context(self, 2)
+
+    def before_next_page(self, timeout_happened):
+        update_session_stats(self, offer_observations(self, 2))
+
+
+@profiled
+class JobOffer3(JobOffer):
+    template_name = 'job_benefits/JobOffer.html'
+
+    def get_form_fields(self):
+        return offer_form_fields(offer_treatment(self, 3))
+
+    def vars_for_template(self):
+        return job_offer_context(self, 3)
+
+    def before_next_page(self, timeout_happened):
+        update_session_stats(self, offer_observations(self, 3))
+
+@profiled
 class JobSelection(Page):
     form_model = 'player'
     # The form field is updated to match the new Player model field
@@ -356,86 +1014,110 @@ class JobSelection(Page):
 
     def vars_for_template(self):
         # The complex logic is now in the Player model. We just call the function.
-        job_packages_for_display = self.get_dynamic_job_packages()
-
+        # It is memoized in participant.vars, so a refresh shows the same list without queries.
+        job_packages_for_display = self.get_dynamic_job_packages(ParticipantSnapshot(self))
         return dict(
             # Data for displaying the tiles
             job_packages_for_display=job_packages_for_display,
+            job_tiles_for_script=job_packages_for_display,
             modal_time_log = self.field_maybe_none('modal_time_log'),
-            job_tiles_for_script=job_packages_for_display
+            **page_assets('JobSelection'),
         )
 
+    def live_method(self, data):
+        record_tile_events(self, data.get('events'))
+
+    def before_next_page(self, timeout_happened):
+        index = self.field_maybe_none('chosen_job_package_index')
+        if index is not None and 0 <= index < 4:
+            update_session_stats(self, [(f'package:{index}', 1)])
+        # ResultsSummary has nothing to submit, so the participant's record is final here.
+        # Checked first: building the row costs a query and a package rebuild.
+        if results_enabled():
+            write_results_record(
+                self.session.code, self.participant.code, _export_header(), _export_row(self.in_all_rounds())
+            )
+
+def results_summary_context(rounds, job_packages_for_display, dwell_times):
+    """
+    ResultsSummary's context from the participant's rounds (Player rows or
+    RoundViews, round 1 first), the packages shown on JobSelection and the
+    per-tile dwell times from recorded_dwell_times() (None if there are none).
+    Touches no database.
+    """
+    player_in_round_1 = rounds[0]
+    player_in_final_round = rounds[-1]
+
+    accepted_treatments = []
+    for decision in offer_decisions(rounds):
+        bonus_info = "N/A"
+        accepted_info = "No"  # Default
+
+        if decision['treatment'] == 'Choice':
+            gym = decision['gym_choice'] or "No decision"
+            bike = decision['bike_choice'] or "No decision"
+            bonus_info = f"Gym: {gym}, Bike: {bike}"
+            if decision['gym_choice'] in ['Cash', 'Benefit'] or decision['bike_choice'] in ['Cash', 'Benefit']:
+                accepted_info = "Yes (at least one)"
+
+        elif decision['treatment'] == 'Non-Monetary Perk':
+            bonus_info = decision['perk_offered']
+            if decision['accept_offer']:
+                accepted_info = "Yes"
+        elif decision['treatment'] == 'Cash Bonus':
+            bonus_info = f"€{Constants.CASH_BONUS}"
+            if decision['accept_offer']:
+                accepted_info = "Yes"
+        
+        accepted_treatments.append({
+            'round_number': decision['step'],
+            'treatment': decision['treatment'],
+            'accepted': accepted_info,
+            'bonus_info': bonus_info,
+        })
+        
+    # Safely get the chosen index and find the corresponding package info.
+    final_package_index = player_in_final_round.field_maybe_none('chosen_job_package_index')
+    chosen_package_info = None
+    if final_package_index is not None and final_package_index < len(job_packages_for_display):
+        chosen_package_info = job_packages_for_display[final_package_index]
+    
+    time_log_data = player_in_final_round.field_maybe_none('modal_time_log')
+    
+    preferred_job_index = player_in_round_1.field_maybe_none('chosen_job_tile')
+    preferred_title = CATALOG.job_title(preferred_job_index, "Not chosen")
+
+    parsed_time_log = dwell_times
+    if parsed_time_log is None and time_log_data:
+        parsed_time_log = {'Error': 'Could not parse time log data.'}
+
+    # Construct the final dictionary for the template.
+    return dict(
+        accepted_treatments=accepted_treatments,
+        chosen_package_info=chosen_package_info,
+        preferred_title=preferred_title,
+        parsed_time_log=parsed_time_log,
+        modal_time_log=time_log_data,
+        preferred_salary=player_in_round_1.preferred_salary,
+        willingness_to_pay_gym=player_in_round_1.willingness_to_pay_gym,
+        willingness_to_pay_bike=player_in_round_1.willingness_to_pay_bike,
+        benefit_ranking=','.join(decode_ranking(player_in_round_1.benefit_ranking)), # Show ranking on results
+    )
+
+
+@profiled
 class ResultsSummary(Page):
     def is_displayed(self):
         return self.round_number == Constants.num_rounds
 
     def vars_for_template(self):
-        player_in_round_1 = self.in_round(1)
-        player_in_final_round = self.in_round(Constants.num_rounds)
-
-        accepted_treatments = []
-        for p in self.in_all_rounds():
-            bonus_info = "N/A"
-            accepted_info = "No"  # Default
-
-            if p.treatment == 'Choice':
-                gym = p.gym_choice or "No decision"
-                bike = p.bike_choice or "No decision"
-                bonus_info = f"Gym: {gym}, Bike: {bike}"
-                if p.gym_choice in ['Cash', 'Benefit'] or p.bike_choice in ['Cash', 'Benefit']:
-                    accepted_info = "Yes (at least one)"
-
-            elif p.treatment == 'Non-Monetary Perk':
-                bonus_info = p.perk_offered
-                if p.accept_offer:
-                    accepted_info = "Yes"
-            elif p.treatment == 'Cash Bonus':
-                bonus_info = f"€{Constants.CASH_BONUS}"
-                if p.accept_offer:
-                    accepted_info = "Yes"
-            
-            accepted_treatments.append({
-                'round_number': p.round_number,
-                'treatment': p.treatment,
-                'accepted': accepted_info,
-                'bonus_info': bonus_info,
-            })
-            
-        # --- THE FIX IS HERE ---
-        # 1. Regenerate the exact same list of tiles shown to the player by calling the new helper method.
-        job_packages_for_display = player_in_final_round.get_dynamic_job_packages()
-        
-        # 2. Safely get the chosen index and find the corresponding package info.
-        final_package_index = player_in_final_round.field_maybe_none('chosen_job_package_index')
-        chosen_package_info = None
-        if final_package_index is not None and final_package_index < len(job_packages_for_display):
-            chosen_package_info = job_packages_for_display[final_package_index]
-        
-        time_log_data = player_in_final_round.field_maybe_none('modal_time_log')
-        
-        preferred_title = "Not chosen"
-        preferred_job_index = player_in_round_1.field_maybe_none('chosen_job_tile')
-        if preferred_job_index is not None and preferred_job_index < len(Constants.JOB_TILES):
-            preferred_title = Constants.JOB_TILES[preferred_job_index]['title']
-
-        parsed_time_log = None
-        if time_log_data:
-            try:
-                parsed_time_log = json.loads(time_log_data)
-            except json.JSONDecodeError:
-                parsed_time_log = {'Error': 'Could not parse time log data.'}
-
-        # 4. Construct the final dictionary for the template.
+        # One query for every round this page needs
+        snapshot = ParticipantSnapshot(self)
+        # Regenerate the exact same list of tiles shown to the player by calling the helper method
+        job_packages_for_display = self.get_dynamic_job_packages(snapshot)
         return dict(
-            accepted_treatments=accepted_treatments,
-            chosen_package_info=chosen_package_info,
-            preferred_title=preferred_title,
-            parsed_time_log=parsed_time_log,
-            modal_time_log=time_log_data,
-            preferred_salary=player_in_round_1.preferred_salary,
-            willingness_to_pay_gym=player_in_round_1.willingness_to_pay_gym,
-            willingness_to_pay_bike=player_in_round_1.willingness_to_pay_bike,
-            benefit_ranking=player_in_round_1.field_maybe_none('benefit_ranking'), # Show ranking on results
+            results_summary_context(snapshot.rounds, job_packages_for_display, recorded_dwell_times(self)),
+            **page_assets('ResultsSummary'),
         )
 
 # =============================================================================
@@ -447,6 +1129,120 @@ page_sequence = [
     JobPreference,
     BenefitRanking, # New page added to the sequence
     JobOffer,
+    *([JobOffer2, JobOffer3] if SINGLE_ROUND else []),
     JobSelection,
     ResultsSummary
-]
\ No newline at end of file
+]
+
+# =============================================================================
+# 4. DATA EXPORT
+# =============================================================================
+EXPORT_CHUNK_SIZE = 500
+NUM_PACKAGES = 4
+# Columns per treatment round; in single-round mode they come from the JobOffer steps
+NUM_OFFER_STEPS = len(Constants.TREATMENTS)
+
+
+def custom_export(players):
+    """
+    One wide row per participant, streamed. oTree's data page passes every
+    Player row as a list, which is sorted in memory; python -m job_benefits.export
+    passes a query, which is read in chunks ordered by participant and round, so
+    memory stays flat no matter how large the database is.
+    The layout is the same in single-round mode, with each JobOffer step in the
+    columns of the round it replaces.
+    """
+    yield _export_header()
+    for participant_rows in _iter_participant_rounds(players):
+        yield _export_row(participant_rows)
+
+
+def _iter_participant_rounds(players):
+    """
+    Yields the list of Player rows (ordered by round) for one participant at a time.
+    """
+    if hasattr(players, 'order_by'):
+        # A query, from python -m job_benefits.export
+        players = players.order_by(Player.participant_id, Player.round_number).yield_per(EXPORT_CHUNK_SIZE)
+    else:
+        # oTree's export view passes the rows it already loaded, as a list
+        players = sorted(players, key=lambda p: (p.participant_id, p.round_number))
+    current_rows = []
+    for p in players:
+        if current_rows and p.participant_id != current_rows[0].participant_id:
+            yield current_rows
+            current_rows = []
+        current_rows.append(p)
+    if current_rows:
+        yield current_rows
+
+
+def _export_header():
+    return (
+        ['session_code', 'participant_code']
+        + [f'treatment_round_{r}' for r in range(1, NUM_OFFER_STEPS + 1)]
+        + [f'{name}_round_{r}' for name in OFFER_DECISION_FIELDS for r in range(1, NUM_OFFER_STEPS + 1)]
+        + ['willingness_to_pay_gym', 'willingness_to_pay_bike', 'preferred_salary', 'chosen_job_tile']
+        + ['benefit_ranking']
+        + [f'rank_{name}' for name in CATALOG.benefit_names]
+        + ['chosen_job_package_index', 'chosen_package_wage', 'chosen_package_benefit']
+        + [f'dwell_ms_tile_{i}' for i in range(NUM_PACKAGES)]
+    )
+
+
+def _export_row(participant_rows):
+    player_in_round_1 = participant_rows[0]
+    player_in_final_round = participant_rows[-1]
+    participant = player_in_round_1.participant
+
+    decisions = offer_decisions(participant_rows)
+    decisions += [{}] * (NUM_OFFER_STEPS - len(decisions))
+
+    ranked_benefits_str = player_in_round_1.field_maybe_none('benefit_ranking')
+    ranked_benefits = decode_ranking(ranked_benefits_str)
+    positions = {name: i + 1 for i, name in enumerate(ranked_benefits)}
+
+    chosen_index = None
+    chosen_package = None
+    if player_in_final_round.round_number == Constants.num_rounds:
+        chosen_index = player_in_final_round.field_maybe_none('chosen_job_package_index')
+        job_packages = build_job_packages(
+            ranked_benefits_str,
+            player_in_round_1.field_maybe_none('preferred_salary'),
+            player_in_round_1.field_maybe_none('willingness_to_pay_gym'),
+            player_in_round_1.field_maybe_none('willingness_to_pay_bike'),
+            player_in_round_1.field_maybe_none('chosen_job_tile'),
+        )
+        if chosen_index is not None and chosen_index < len(job_packages):
+            chosen_package = job_packages[chosen_index]
+
+    dwell_times = {}
+    # Only the final round has a JobSelection, so earlier dropouts need no query
+    if player_in_final_round.round_number == Constants.num_rounds:
+        dwell_times = recorded_dwell_times(player_in_final_round) or {}
+
+    return (
+        [participant.session.code, participant.code]
+        + [d.get('treatment') for d in decisions]
+        + [d.get(name) for name in OFFER_DECISION_FIELDS for d in decisions]
+        + [
+            player_in_round_1.field_maybe_none('willingness_to_pay_gym'),
+            player_in_round_1.field_maybe_none('willingness_to_pay_bike'),
+            player_in_round_1.field_maybe_none('preferred_salary'),
+            player_in_round_1.field_maybe_none('chosen_job_tile'),
+        ]
+        + [','.join(ranked_benefits)]
+        + [positions.get(name) for name in CATALOG.benefit_names]
+        + [
+            chosen_index,
+            chosen_package['wage'] if chosen_package else None,
+            chosen_package['benefits_summary'][0] if chosen_package else None,
+        ]
+        + [dwell_times.get(f'Tile Index {i}') for i in range(NUM_PACKAGES)]
+    )
+
+
+# Renders every page on a throwaway session when the server starts, before it
+# takes traffic, if JOB_BENEFITS_WARMUP is set (the Procfile's web process).
+# Last, because registering it imports oTree's ASGI app, which imports this module.
+warm_up(results_enabled=results_enabled())
@@ -0,0 +1,178 @@
+"""
+Vectorized counterpart of build_job_packages() for whole sessions.
+
+Used by the export and reporting scripts, which would otherwise call
+Player.get_dynamic_job_packages() in a Python loop over every player.
+NumPy is only needed here, not by the live app.
+
+Check that both produce identical packages, edge cases included, with:
+
+    python -m job_benefits.batch --check 10000
+
+The bot tests run the same check on a smaller sample.
+
+One difference is deliberate: a legacy (comma-separated) ranking that names a
+benefit missing from CATALOG, e.g. from a session run with another catalog,
+makes encode_rankings() raise ValueError, while build_job_packages() still
+builds packages for it, with an empty description. The batch arrays can only
+hold catalog indexes, so such rows have to go through build_job_packages().
+"""
+import argparse
+import random
+
+import numpy as np
+
+from . import CATALOG, Constants, build_job_packages, decode_ranking, encode_ranking
+
+# Marks a missing chosen_job_tile, or an unused slot in a ranking row
+MISSING = -1
+
+
+def encode_rankings(ranking_strs, width=None):
+    """
+    Converts stored benefit_ranking values (compact or legacy names) into an
+    (N, width) array of indices into CATALOG.benefits, padded with MISSING.
+    Empty or None rankings become a row of MISSING. Raises ValueError for a
+    benefit name that isn't in the catalog (see the module docstring).
+    """
+    width = width or len(CATALOG.benefits)
+    rankings = np.full((len(ranking_strs), width), MISSING, dtype=np.int64)
+    for row, ranking_str in enumerate(ranking_strs):
+        names = decode_ranking(ranking_str)
+        if not names:
+            continue
+        try:
+            rankings[row, :len(names)] = [CATALOG.benefit_index[name] for name in names]
+        except KeyError as e:
+            raise ValueError(f"Row {row}: unknown benefit {e.args[0]!r}") from None
+    return rankings
+
+
+def build_job_packages_batch(preferred_salaries, wtp_sums, chosen_tiles, rankings):
+    """
+    Builds the 4 job packages for N participants in one pass.
+
+    preferred_salaries: (N,) floats; NaN or 0 falls back to Constants.BASE_SALARY
+    wtp_sums: (N,) floats, gym + bike WTP; NaN counts as 0
+    chosen_tiles: (N,) ints; MISSING for no choice
+    rankings: (N, K) ints from encode_rankings()
+
+    Returns a dict of arrays:
+    valid (N,) bool: False where build_job_packages() would return []
+    title_index (N,) int: index into CATALOG.jobs, MISSING for "General Position"
+    wage (N, 4) int: salary per package index
+    benefit_index (N, 4) int: index into CATALOG.benefits per package index
+    """
+    preferred_salaries = np.asarray(preferred_salaries, dtype=np.float64)
+    wtp_sums = np.nan_to_num(np.asarray(wtp_sums, dtype=np.float64), nan=0.0)
+    chosen_tiles = np.asarray(chosen_tiles, dtype=np.int64)
+    rankings = np.atleast_2d(np.asarray(rankings, dtype=np.int64))
+
+    salary = np.where(
+        np.isnan(preferred_salaries) | (preferred_salaries == 0),
+        Constants.BASE_SALARY,
+        preferred_salaries,
+    )
+    tier1 = salary
+    tier4 = np.maximum(0, salary - wtp_sums)
+    step = np.where(wtp_sums > 0, (tier1 - tier4) / 3, 0)
+    wage = np.round(np.stack([tier1, tier1 - step, tier1 - 2 * step, tier4], axis=1)).astype(np.int64)
+
+    title_index = np.where(
+        (chosen_tiles >= 0) & (chosen_tiles < len(CATALOG.jobs)), chosen_tiles, MISSING
+    )
+
+    num_ranked = (rankings != MISSING).sum(axis=1)
+    valid = num_ranked >= 4
+
+    # Tiers are ranks 1, 2, n-2, n-1 and are matched inversely to the wages
+    rows = np.arange(len(rankings))
+    last = np.maximum(num_ranked, 4)
+    benefit_index = np.stack([
+        rankings[rows, last - 2],
+        rankings[rows, last - 3],
+        rankings[:, 1],
+        rankings[:, 0],
+    ], axis=1)
+    benefit_index[~valid] = MISSING
+
+    return dict(valid=valid, title_index=title_index, wage=wage, benefit_index=benefit_index)
+
+
+def to_job_packages(batch, row):
+    """
+    Expands one row of build_job_packages_batch() into the same list of dicts
+    that build_job_packages() returns.
+    """
+    if not batch['valid'][row]:
+        return []
+    title_index = batch['title_index'][row]
+    title = CATALOG.job_title(None if title_index == MISSING else int(title_index), "General Position")
+    job_packages = []
+    for i in range(4):
+        benefit_name = CATALOG.benefit_names[batch['benefit_index'][row, i]]
+        job_packages.append({
+            'title': title,
+            'wage': int(batch['wage'][row, i]),
+            'benefits_summary': [benefit_name],
+            'index': i,
+            'benefit_details': {
+                benefit_name: CATALOG.descriptions.get(benefit_name, '')
+            }
+        })
+    return job_packages
+
+
+def check_against_scalar(ranking_strs, preferred_salaries, wtp_gyms, wtp_bikes, chosen_tiles):
+    """
+    Raises AssertionError on the first participant whose batch packages differ
+    from build_job_packages(). Inputs are plain per-player lists (None allowed).
+    """
+    batch = build_job_packages_batch(
+        [np.nan if s is None else s for s in preferred_salaries],
+        [(g or 0) + (b or 0) for g, b in zip(wtp_gyms, wtp_bikes)],
+        [MISSING if t is None else t for t in chosen_tiles],
+        encode_rankings(ranking_strs),
+    )
+    for row, args in enumerate(zip(ranking_strs, preferred_salaries, wtp_gyms, wtp_bikes, chosen_tiles)):
+        expected = build_job_packages(*args)
+        actual = to_job_packages(batch, row)
+        assert actual == expected, f"Row {row}: {actual!r} != {expected!r}"
+
+
+def random_inputs(rng, n):
+    """
+    n players' worth of check_against_scalar() inputs, mixing complete rows with
+    the edge cases: missing or zero salaries and WTP, short, empty and legacy
+    (comma-separated) rankings, and missing or out-of-range job tiles.
+    """
+    names = list(CATALOG.benefit_names)
+    ranking_strs, salaries, wtp_gyms, wtp_bikes, tiles = [], [], [], [], []
+    for _ in range(n):
+        ranking = rng.sample(names, rng.choice([len(names)] * 3 + list(range(len(names)))))
+        ranking_strs.append(rng.choice([
+            encode_ranking(ranking),
+            encode_ranking(ranking),
+            ','.join(ranking),
+            None,
+        ]))
+        salaries.append(rng.choice([None, 0, rng.randint(1, 8000), rng.randint(1, 8000)]))
+        wtp_gyms.append(rng.choice([None, 0, rng.randint(0, 10000)]))
+        wtp_bikes.append(rng.choice([None, 0, rng.randint(0, 10000)]))
+        tiles.append(rng.choice([None, len(CATALOG.jobs), rng.randrange(len(CATALOG.jobs))]))
+    return ranking_strs, salaries, wtp_gyms, wtp_bikes, tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare build_job_packages_batch() with build_job_packages().")
+    parser.add_argument('--check', type=int, default=10_000, metavar='N', help='random players to compare')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    check_against_scalar(*random_inputs(random.Random(args.seed), args.check))
+    print(f"{args.check} players: batch and scalar packages match")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,360 @@
+"""
+Microbenchmarks for the app's pure logic, with a regression gate. No server or
+database is needed: the cases run on synthetic participants built in memory.
+
+    python -m job_benefits.benchmarks run --save bench_baseline.json
+    python -m job_benefits.benchmarks compare bench_baseline.json --threshold 0.3
+
+`run` prints the cost per participant of each case at each size; `compare`
+measures again at the baseline's sizes and exits with status 1 if any case is
+more than threshold (as a fraction) slower than the baseline, and by at least
+--min-diff microseconds per participant, comparing medians, and if its lower
+quartile is above the baseline's upper quartile. The suite runs --rounds rounds, each timing
+every case once for at least MIN_MEASUREMENT_SECONDS, plus a fixed reference
+workload; the table shows medians, and baselines keep each round. Before
+comparing, the baseline is scaled by how much faster or slower the reference
+ran, which cancels drift of the whole machine. Baselines are still
+machine-specific: record and compare them on the same host.
+
+Cases:
+    job_packages_cold   get_dynamic_job_packages with an empty cache (builds the list)
+    job_packages_warm   get_dynamic_job_packages served from participant.vars
+    results_summary     ResultsSummary's context assembly from a participant's rounds
+    benefit_ranking     BenefitRanking's template context
+    time_log_parse      parsing a submitted modal_time_log
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from . import (
+    CATALOG,
+    SINGLE_ROUND,
+    BenefitRanking,
+    Constants,
+    Player,
+    RoundView,
+    encode_ranking,
+    parse_time_log,
+    recorded_dwell_times,
+    results_summary_context,
+)
+from .tests import random_job_offer, random_job_selection
+
+DEFAULT_SIZES = (1, 100, 10_000, 100_000)
+DEFAULT_ROUNDS = 7
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_MIN_DIFF_US = 0.5
+REFERENCE_KEY = '_reference'
+
+# Small sizes are looped until one measurement takes at least this long, like timeit
+MIN_MEASUREMENT_SECONDS = 0.2
+
+
+class _Participant:
+    __slots__ = ('vars',)
+
+    def __init__(self):
+        self.vars = {}
+
+
+class _PlayerRow:
+    """Just enough of a Player row for the functions benchmarked here."""
+
+    def __init__(self, participant, round_number, values):
+        self.participant = participant
+        self.round_number = round_number
+        self._values = values
+
+    def field_maybe_none(self, name):
+        return self._values.get(name)
+
+
+def synthetic_participant(rng):
+    """One participant who finished every page, as a list of _PlayerRows (round 1 first)."""
+    ranking = list(CATALOG.benefit_names)
+    rng.shuffle(ranking)
+    round_1 = dict(
+        willingness_to_pay_gym=rng.randint(0, 1500),
+        willingness_to_pay_bike=rng.randint(0, 1500),
+        chosen_job_tile=rng.randrange(len(CATALOG.jobs)),
+        preferred_salary=rng.randint(2000, 6000),
+        benefit_ranking=encode_ranking(ranking),
+    )
+    participant = _Participant()
+    participant.vars['job_package_inputs'] = (
+        round_1['benefit_ranking'],
+        round_1['preferred_salary'],
+        round_1['willingness_to_pay_gym'],
+        round_1['willingness_to_pay_bike'],
+        round_1['chosen_job_tile'],
+    )
+
+    order = list(Constants.TREATMENTS)
+    rng.shuffle(order)
+    perk = rng.choice(Constants.NON_MONETARY_PERKS)
+    if SINGLE_ROUND:
+        values = dict(round_1, treatment_order=','.join(order), perk_offered=perk)
+        for treatment in order:
+            values.update(random_job_offer(treatment))
+        values.update(random_job_selection())
+        return [_PlayerRow(participant, 1, values)]
+
+    rows = []
+    for round_number, treatment in enumerate(order, start=1):
+        values = dict(round_1) if round_number == 1 else {}
+        values.update(treatment=treatment, **random_job_offer(treatment))
+        if treatment == 'Non-Monetary Perk':
+            values['perk_offered'] = perk
+        if round_number == Constants.num_rounds:
+            values.update(random_job_selection())
+        rows.append(_PlayerRow(participant, round_number, values))
+    return rows
+
+
+# Each case takes the list of synthetic participants, does its per-participant
+# setup outside the timed region, and returns the function to time.
+
+def case_job_packages_cold(participants):
+    players = [rows[-1] for rows in participants]
+
+    def run():
+        for player in players:
+            player.participant.vars.pop('job_packages_cache', None)
+            Player.get_dynamic_job_packages(player)
+    return run
+
+
+def case_job_packages_warm(participants):
+    players = [rows[-1] for rows in participants]
+    for player in players:
+        Player.get_dynamic_job_packages(player)
+
+    def run():
+        for player in players:
+            Player.get_dynamic_job_packages(player)
+    return run
+
+
+def case_results_summary(participants):
+    inputs = []
+    for rows in participants:
+        snapshot_rounds = tuple(RoundView(row) for row in rows)
+        inputs.append((snapshot_rounds, Player.get_dynamic_job_packages(rows[-1]), rows[-1]))
+
+    def run():
+        # The synthetic rows all have a modal_time_log, so no TileEvents are read
+        for snapshot_rounds, job_packages, final_row in inputs:
+            results_summary_context(snapshot_rounds, job_packages, recorded_dwell_times(final_row))
+    return run
+
+
+def case_benefit_ranking(participants):
+    players = [rows[0] for rows in participants]
+
+    def run():
+        for player in players:
+            BenefitRanking.vars_for_template(player)
+    return run
+
+
+def case_time_log_parse(participants):
+    time_logs = [rows[-1].field_maybe_none('modal_time_log') for rows in participants]
+
+    def run():
+        for time_log in time_logs:
+            parse_time_log(time_log)
+    return run
+
+
+def reference_workload():
+    """
+    Fixed, app-independent work (dicts, sorting, JSON) timed in every round.
+    Its ratio to the baseline's tells how much faster or slower the machine is
+    running than when the baseline was recorded.
+    """
+    payload = json.dumps({f'Tile Index {i}': i * 997 % 1000 for i in range(50)})
+
+    def run():
+        for _ in range(20):
+            values = json.loads(payload)
+            sorted(values.items(), key=lambda item: item[1])
+    return run
+
+
+CASES = dict(
+    job_packages_cold=case_job_packages_cold,
+    job_packages_warm=case_job_packages_warm,
+    results_summary=case_results_summary,
+    benefit_ranking=case_benefit_ranking,
+    time_log_parse=case_time_log_parse,
+)
+
+
+def calibrate(run, size):
+    """Loop count that makes one measurement take at least MIN_MEASUREMENT_SECONDS."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        if time.perf_counter() - started >= MIN_MEASUREMENT_SECONDS or size * loops >= 1_000_000:
+            return loops
+        loops *= 10
+
+
+def measure(run, size, loops):
+    """Seconds per participant of one measurement."""
+    started = time.perf_counter()
+    for _ in range(loops):
+        run()
+    return (time.perf_counter() - started) / (loops * size)
+
+
+def run_suite(sizes, rounds, cases, seed=0):
+    """
+    {'<case>@<size>': [seconds per participant, one per round]}. Each round
+    measures every case once, so a slow stretch of the machine hits all cases
+    instead of every sample of one.
+    """
+    rng = random.Random(seed)
+    # random_job_offer and random_job_selection draw from the module-level generator
+    random.seed(seed)
+    participants = [synthetic_participant(rng) for _ in range(max(sizes))]
+    runs = {}
+    for size in sizes:
+        for name in cases:
+            run = CASES[name](participants[:size])
+            runs[f'{name}@{size}'] = (run, size, calibrate(run, size))
+    reference = reference_workload()
+    runs[REFERENCE_KEY] = (reference, 1, calibrate(reference, 1))
+    samples = {key: [] for key in runs}
+    for round_number in range(1, rounds + 1):
+        for key, (run, size, loops) in runs.items():
+            samples[key].append(measure(run, size, loops))
+        print(f"  round {round_number}/{rounds} done", file=sys.stderr)
+    return samples
+
+
+def quartiles(rounds):
+    """(lower, upper) quartile of the rounds; a single round is both."""
+    if len(rounds) < 2:
+        return rounds[0], rounds[0]
+    lower, _, upper = statistics.quantiles(rounds, n=4, method='inclusive')
+    return lower, upper
+
+
+def format_results(samples, baseline=None, threshold=DEFAULT_THRESHOLD, min_diff_us=DEFAULT_MIN_DIFF_US):
+    """
+    Table of the median of each case, with the change against baseline if given.
+    Returns (text, regressions). The baseline is first scaled by how the
+    reference workload's speed changed, so a machine that is slower overall does
+    not read as a regression. A case then regresses when its median is more than
+    threshold and min_diff_us slower than the baseline's, and its lower quartile
+    is above the baseline's upper quartile, so one noisy round on either side
+    neither hides a regression nor makes one.
+    """
+    lines = [f"{'case':<32}{'us/participant':>16}" + (f"{'baseline':>12}{'change':>10}" if baseline else '')]
+    regressions = []
+    scale = 1
+    if baseline and REFERENCE_KEY in samples and REFERENCE_KEY in baseline:
+        scale = statistics.median(samples[REFERENCE_KEY]) / statistics.median(baseline[REFERENCE_KEY])
+        baseline = {key: [seconds * scale for seconds in rounds] for key, rounds in baseline.items()}
+    for key, rounds in samples.items():
+        if key == REFERENCE_KEY:
+            continue
+        seconds = statistics.median(rounds)
+        line = f"{key:<32}{seconds * 1e6:>16.2f}"
+        if baseline:
+            if key in baseline:
+                base = statistics.median(baseline[key])
+                change = seconds / base - 1
+                line += f"{base * 1e6:>12.2f}{change:>+10.1%}"
+                if (
+                    change > threshold
+                    and (seconds - base) * 1e6 >= min_diff_us
+                    and quartiles(rounds)[0] > quartiles(baseline[key])[1]
+                ):
+                    regressions.append(key)
+                    line += '  REGRESSION'
+            else:
+                line += f"{'-':>12}{'new':>10}"
+        lines.append(line)
+    if baseline:
+        lines.append(
+            f"baseline scaled by {scale:.2f}: the reference workload ran {abs(scale - 1):.0%} "
+            f"{'slower' if scale >= 1 else 'faster'} than when recorded"
+        )
+    return '\n'.join(lines), regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='measure and print, optionally saving a baseline')
+    run_parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    run_parser.add_argument('--save', help='write the results to this baseline file')
+
+    compare_parser = commands.add_parser('compare', help='measure and fail on regressions against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument(
+        '--min-diff', type=float, default=DEFAULT_MIN_DIFF_US, help='microseconds per participant'
+    )
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+        sub.add_argument('--cases', default=','.join(CASES), help='comma-separated subset of the cases')
+    args = parser.parse_args(argv)
+
+    cases = args.cases.split(',')
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    if args.command == 'run':
+        sizes = sorted({int(size) for size in args.sizes.split(',')})
+        samples = run_suite(sizes, args.rounds, cases)
+        print(format_results(samples)[0])
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(dict(
+                    python=platform.python_version(),
+                    machine=platform.platform(),
+                    single_round=SINGLE_ROUND,
+                    samples=samples,
+                ), f, indent=2)
+            print(f"baseline saved to {args.save}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if 'samples' not in baseline:
+        parser.error("the baseline predates per-round samples; record it again with run --save")
+    if baseline.get('single_round', False) != SINGLE_ROUND:
+        parser.error("the baseline was recorded with a different JOB_BENEFITS_SINGLE_ROUND setting")
+    baseline_samples = {
+        key: rounds for key, rounds in baseline['samples'].items() if key.split('@')[0] in cases + [REFERENCE_KEY]
+    }
+    sizes = sorted({int(key.split('@')[1]) for key in baseline_samples if key != REFERENCE_KEY})
+    if not sizes:
+        parser.error("the baseline has no results for these cases")
+    samples = run_suite(sizes, args.rounds, cases)
+    report, regressions = format_results(samples, baseline_samples, args.threshold, args.min_diff)
+    print(report)
+    if regressions:
+        print(
+            f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}"
+            f" and {args.min_diff} us per participant (median)"
+        )
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+"""
+Immutable benefit/job catalog, built and validated once at import.
+
+The records double as template contexts, and the name->index maps the pages
+need are precomputed, so no page allocates them per request. No page sends the
+catalog to its script (JobSelection's script data is the participant's own
+packages), so there are no JSON forms of it to precompute.
+By default the catalog comes from Constants; setting JOB_BENEFITS_CATALOG to
+a JSON file with the keys benefits_to_rank, benefit_descriptions and job_tiles
+runs a variant without code edits.
+"""
+import json
+import logging
+import string
+from types import MappingProxyType
+
+# One character per benefit in a stored ranking: its index in the catalog
+RANKING_ALPHABET = string.digits + string.ascii_lowercase
+# build_job_packages() picks 4 distinct ranks
+MIN_BENEFITS = 4
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogError(ValueError):
+    pass
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _init(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+
+class Benefit(_Frozen):
+    __slots__ = ('index', 'name', 'description', 'code')
+
+    def __init__(self, index, name, description):
+        self._init(index=index, name=name, description=description, code=RANKING_ALPHABET[index])
+
+
+class JobTile(_Frozen):
+    __slots__ = ('index', 'title', 'wage', 'benefits', 'description', 'benefit_details')
+
+    def __init__(self, index, title, wage, benefits, description, benefit_details):
+        self._init(
+            index=index,
+            title=title,
+            wage=wage,
+            benefits=tuple(benefits),
+            description=description,
+            benefit_details=MappingProxyType(dict(benefit_details)),
+        )
+
+
+class Catalog(_Frozen):
+    __slots__ = (
+        'benefits', 'jobs', 'benefit_names', 'benefit_index', 'descriptions',
+        'ranking_codes',
+    )
+
+    def __init__(self, benefits, jobs):
+        self._init(
+            benefits=tuple(benefits),
+            jobs=tuple(jobs),
+            benefit_names=tuple(b.name for b in benefits),
+            benefit_index=MappingProxyType({b.name: b.index for b in benefits}),
+            descriptions=MappingProxyType({b.name: b.description for b in benefits}),
+            ranking_codes=RANKING_ALPHABET[:len(benefits)],
+        )
+
+    def job_title(self, index, default):
+        if index is not None and 0 <= index < len(self.jobs):
+            return self.jobs[index].title
+        return default
+
+
+def build_catalog(benefits_to_rank, benefit_descriptions, job_tiles):
+    """
+    Validates the raw catalog data and returns a Catalog; raises CatalogError.
+    A job tile whose benefits and benefit_details disagree is only logged: no
+    page shows those lists, so the study content is left for its authors to fix.
+    """
+    errors = []
+    names = list(benefits_to_rank)
+    if not MIN_BENEFITS <= len(names) <= len(RANKING_ALPHABET):
+        errors.append(f"need {MIN_BENEFITS} to {len(RANKING_ALPHABET)} benefits to rank, got {len(names)}")
+    if len(set(names)) != len(names):
+        errors.append("benefits_to_rank contains duplicates")
+    for name in names:
+        if not benefit_descriptions.get(name):
+            errors.append(f"benefit '{name}' has no description")
+    for name in benefit_descriptions:
+        if name not in names:
+            errors.append(f"description for '{name}', which is not a benefit to rank")
+
+    titles = [tile.get('title') for tile in job_tiles]
+    if len(set(titles)) != len(titles):
+        errors.append("job_tiles contains duplicate titles")
+    for tile in job_tiles:
+        label = f"job tile '{tile.get('title')}'"
+        missing = {'title', 'wage', 'benefits', 'description', 'benefit_details'} - set(tile)
+        if missing:
+            errors.append(f"{label} is missing {', '.join(sorted(missing))}")
+            continue
+        if not isinstance(tile['wage'], int) or tile['wage'] < 0:
+            errors.append(f"{label} has an invalid wage")
+        if set(tile['benefits']) != set(tile['benefit_details']):
+            logger.warning(
+                "job_benefits catalog: %s lists benefits %s but describes %s",
+                label, sorted(tile['benefits']), sorted(tile['benefit_details']),
+            )
+
+    if errors:
+        raise CatalogError("Invalid job_benefits catalog:\n  " + "\n  ".join(errors))
+
+    benefits = [Benefit(i, name, benefit_descriptions[name]) for i, name in enumerate(names)]
+    jobs = [JobTile(index=i, **tile) for i, tile in enumerate(job_tiles)]
+    return Catalog(benefits, jobs)
+
+
+def load_catalog(path, defaults):
+    """Catalog from the JSON file at path if given, otherwise from the defaults object (Constants)."""
+    if path:
+        with open(path) as f:
+            data = json.load(f)
+        return build_catalog(data['benefits_to_rank'], data['benefit_descriptions'], data['job_tiles'])
+    return build_catalog(defaults.BENEFITS_TO_RANK, defaults.BENEFIT_DESCRIPTIONS, defaults.JOB_TILES)
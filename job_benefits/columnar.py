@@ -0,0 +1,190 @@
+"""
+Columnar results snapshot: one typed Arrow record per participant, written as
+they reach ResultsSummary (the last page, which has nothing to submit), so
+analysts never have to re-export the CSV or re-parse modal_time_log.
+
+Set JOB_BENEFITS_RESULTS_DIR to enable it. Records have the columns of
+custom_export with proper types (ranking positions and dwell times as ints,
+decisions as bools/strings) and are stored as uncompressed Arrow IPC files,
+which can be memory-mapped:
+
+    <dir>/session=<code>/<participant code>.arrow   one per participant
+    <dir>/session=<code>/data.arrow                 after compaction
+
+Compact a session's participant files into data.arrow (optionally also
+writing a Parquet copy of everything) with:
+
+    python -m job_benefits.columnar compact <dir> [--parquet results.parquet]
+
+and read with read_results(<dir>) or pyarrow.dataset.dataset(<dir>,
+format='ipc', partitioning='hive'). pyarrow is only needed when enabled.
+"""
+import argparse
+import datetime
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.environ.get('JOB_BENEFITS_RESULTS_DIR')
+COMPACTED_NAME = 'data.arrow'
+
+# Column types by custom_export column name (prefix match); anything else is a string
+INT_PREFIXES = ('chosen_job_tile', 'rank_', 'chosen_job_package_index', 'chosen_package_wage', 'dwell_ms_tile_')
+FLOAT_PREFIXES = ('willingness_to_pay_', 'preferred_salary')
+BOOL_PREFIXES = ('accept_offer_round_',)
+
+_pyarrow_missing = False
+
+
+def _arrow_type(pa, column):
+    if column.startswith(INT_PREFIXES):
+        return pa.int64()
+    if column.startswith(FLOAT_PREFIXES):
+        return pa.float64()
+    if column.startswith(BOOL_PREFIXES):
+        return pa.bool_()
+    return pa.string()
+
+
+def _convert(arrow_type, value, pa):
+    if value is None:
+        return None
+    if arrow_type == pa.int64():
+        return int(value)
+    if arrow_type == pa.float64():
+        return float(value)
+    if arrow_type == pa.bool_():
+        return bool(value)
+    return str(value)
+
+
+def results_record(header, row):
+    """One-row Arrow table from a custom_export header and row, plus finished_at."""
+    import pyarrow as pa
+
+    fields = [pa.field(column, _arrow_type(pa, column)) for column in header]
+    fields.append(pa.field('finished_at', pa.timestamp('ms', tz='UTC')))
+    values = [_convert(field.type, value, pa) for field, value in zip(fields, row)]
+    values.append(datetime.datetime.now(datetime.timezone.utc))
+    schema = pa.schema(fields)
+    return pa.table({field.name: [value] for field, value in zip(fields, values)}, schema=schema)
+
+
+def _write_arrow(table, path):
+    """Writes atomically: readers never see a partial file (dot-files are skipped by pyarrow.dataset)."""
+    import pyarrow as pa
+
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def results_enabled():
+    """True while records are written: RESULTS_DIR is set and pyarrow hasn't been found missing."""
+    return bool(RESULTS_DIR) and not _pyarrow_missing
+
+
+def write_results_record(session_code, participant_code, header, row):
+    """
+    Stores one participant's record under RESULTS_DIR, if set. Writing it again
+    replaces the file, so a repeated call never duplicates the participant.
+    """
+    global _pyarrow_missing
+    if not results_enabled():
+        return
+    try:
+        table = results_record(header, row)
+    except ImportError:
+        _pyarrow_missing = True
+        logger.warning("JOB_BENEFITS_RESULTS_DIR is set but pyarrow isn't installed; results snapshot disabled")
+        return
+    session_dir = Path(RESULTS_DIR) / f'session={session_code}'
+    session_dir.mkdir(parents=True, exist_ok=True)
+    _write_arrow(table, session_dir / f'{participant_code}.arrow')
+
+
+def _memory_mapped(path):
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def _session_files(session_dir):
+    return sorted(path for path in session_dir.glob('*.arrow') if not path.name.startswith('.'))
+
+
+def _concat_files(paths):
+    import pyarrow as pa
+
+    tables = [_memory_mapped(path) for path in paths]
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='default')
+
+
+def read_session(session_dir):
+    """All records of one session directory as a Table backed by memory-mapped files."""
+    return _concat_files(_session_files(Path(session_dir)))
+
+
+def read_results(directory):
+    """
+    Every session under directory as one Table. Sessions run with different
+    catalogs have different rank_ columns; the missing ones are null.
+    """
+    import pyarrow as pa
+
+    tables = []
+    for session_dir in sorted(Path(directory).glob('session=*')):
+        table = read_session(session_dir)
+        if table is not None:
+            tables.append(table)
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='default')
+
+
+def compact_session(session_dir):
+    """Merges a session's participant files into data.arrow; returns how many were merged."""
+    session_dir = Path(session_dir)
+    compacted = session_dir / COMPACTED_NAME
+    participant_files = [path for path in _session_files(session_dir) if path != compacted]
+    if not participant_files:
+        return 0
+    # Exactly the files unlinked below: a participant finishing meanwhile waits for the next run
+    table = _concat_files(([compacted] if compacted.exists() else []) + participant_files)
+    # Rewritten before the merged files are removed, so a crash in between only leaves duplicates
+    _write_arrow(table.combine_chunks(), compacted)
+    for path in participant_files:
+        path.unlink()
+    return len(participant_files)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    compact_parser = commands.add_parser('compact', help="merge each session's participant files")
+    compact_parser.add_argument('directory')
+    compact_parser.add_argument('--parquet', help='also write every session to this Parquet file')
+    args = parser.parse_args(argv)
+
+    for session_dir in sorted(Path(args.directory).glob('session=*')):
+        merged = compact_session(session_dir)
+        if merged:
+            print(f"{session_dir.name}: merged {merged} participant files")
+    if args.parquet:
+        import pyarrow.parquet as pq
+
+        table = read_results(args.directory)
+        if table is None:
+            parser.error(f"no results under {args.directory}")
+        pq.write_table(table, args.parquet)
+        print(f"{table.num_rows} participants written to {args.parquet}")
+
+
+if __name__ == '__main__':
+    main()
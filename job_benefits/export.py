@@ -0,0 +1,50 @@
+"""
+Writes custom_export's wide CSV straight from the database, streaming:
+
+    python -m job_benefits.export results.csv [--session CODE]
+
+oTree's data page hands custom_export every Player row as a list. Here it gets
+a query instead, which _iter_participant_rounds reads in chunks of
+EXPORT_CHUNK_SIZE ordered by participant and round, so memory stays flat no
+matter how many sessions the database holds. Run it from the project
+directory, with the server's DATABASE_URL.
+"""
+import argparse
+import csv
+import os
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output')
+    parser.add_argument('--session', help='only this session code')
+    args = parser.parse_args(argv)
+
+    # oTree finds settings.py relative to the working directory
+    sys.path.insert(0, os.getcwd())
+    import otree.main
+    from otree.database import dbq
+    from otree.export import sanitize_for_csv
+    from otree.models import Session
+    from sqlalchemy.orm import joinedload
+
+    from . import Player, custom_export
+
+    otree.main.setup()
+    query = dbq(Player).options(joinedload(Player.participant, innerjoin=True))
+    if args.session:
+        query = query.filter(Player.session_id == Session.objects_get(code=args.session).id)
+
+    num_rows = 0
+    with open(args.output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for row in custom_export(query):
+            writer.writerow([sanitize_for_csv(value) for value in row])
+            num_rows += 1
+    print(f"{num_rows - 1} participants written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
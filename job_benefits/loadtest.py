@@ -0,0 +1,188 @@
+"""
+Load harness: drives many concurrent bot participants through page_sequence
+against a running server and reports per-page latency percentiles and throughput.
+
+Start a server first (e.g. `otree devserver` or `otree prodserver`), with
+OTREE_REST_KEY set if OTREE_AUTH_LEVEL is, then run:
+
+    python -m job_benefits.loadtest --participants 500 --concurrency 100
+
+Form inputs come from the same generators the PlayerBot uses in tests.py.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+from . import Constants, offer_form_fields
+from .tests import (
+    random_value_perception,
+    random_job_preference,
+    random_benefit_ranking,
+    random_job_offer,
+    random_job_selection,
+)
+
+PAGE_URL_RE = re.compile(r'/p/[^/]+/job_benefits/(?P<page>\w+)/\d+')
+HIDDEN_INPUT_RE = re.compile(r'<input[^>]*type="hidden"[^>]*>', re.IGNORECASE)
+ATTR_RE = re.compile(r'(name|value)="([^"]*)"')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def add(self, key, seconds):
+        with self._lock:
+            self.samples[key].append(seconds)
+
+    def report(self, wall_time):
+        lines = [f"{'page / method':<28}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"]
+        for key in sorted(self.samples):
+            values = sorted(self.samples[key])
+            lines.append(
+                f"{key:<28}{len(values):>7}"
+                f"{percentile(values, 50) * 1000:>10.1f}"
+                f"{percentile(values, 95) * 1000:>10.1f}"
+                f"{percentile(values, 99) * 1000:>10.1f}"
+                f"{len(values) / wall_time:>10.1f}"
+            )
+        total = sum(len(v) for v in self.samples.values())
+        lines.append(f"total: {total} requests in {wall_time:.1f}s ({total / wall_time:.1f} req/s)")
+        return '\n'.join(lines)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def form_data_for(page_name, html):
+    """Randomized valid inputs for one page, plus any hidden inputs oTree rendered."""
+    data = {}
+    for tag in HIDDEN_INPUT_RE.findall(html):
+        attrs = dict(ATTR_RE.findall(tag))
+        if 'name' in attrs:
+            data[attrs['name']] = attrs.get('value', '')
+    if page_name == 'ValuePerception':
+        data.update(random_value_perception())
+    elif page_name == 'JobPreference':
+        data.update(random_job_preference())
+    elif page_name == 'BenefitRanking':
+        data.update(random_benefit_ranking())
+    elif page_name.startswith('JobOffer'):
+        # The treatment isn't in the URL; tell it by the inputs the page rendered
+        treatment = next(
+            t for t in Constants.TREATMENTS if f'name="{offer_form_fields(t)[0]}"' in html
+        )
+        data.update(random_job_offer(treatment))
+    elif page_name == 'JobSelection':
+        data.update(random_job_selection())
+    return {k: ('True' if v is True else 'False' if v is False else v) for k, v in data.items()}
+
+
+def run_participant(start_url, recorder, timeout):
+    opener = urllib.request.build_opener(
+        _NoRedirect, urllib.request.HTTPCookieProcessor(CookieJar())
+    )
+    url = start_url
+    while True:
+        started = time.perf_counter()
+        try:
+            response = opener.open(url, timeout=timeout)
+            html = response.read().decode('utf-8')
+            url = response.geturl()
+        except urllib.error.HTTPError as e:
+            if e.code not in (301, 302, 303, 307):
+                raise
+            recorder.add('redirect GET', time.perf_counter() - started)
+            url = urllib.parse.urljoin(url, e.headers['Location'])
+            continue
+
+        match = PAGE_URL_RE.search(url)
+        if not match:
+            # Past the end of page_sequence
+            return
+        page_name = match.group('page')
+        recorder.add(f'{page_name} GET', time.perf_counter() - started)
+        if page_name == 'ResultsSummary':
+            return
+
+        body = urllib.parse.urlencode(form_data_for(page_name, html)).encode()
+        started = time.perf_counter()
+        try:
+            opener.open(urllib.request.Request(url, data=body), timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code not in (301, 302, 303, 307):
+                raise
+            recorder.add(f'{page_name} POST', time.perf_counter() - started)
+            url = urllib.parse.urljoin(url, e.headers['Location'])
+        else:
+            # oTree re-renders the page instead of redirecting when validation fails
+            raise RuntimeError(f'{page_name} rejected the submitted form')
+
+
+def create_session(server, num_participants, rest_key):
+    request = urllib.request.Request(
+        urllib.parse.urljoin(server, '/api/sessions'),
+        data=json.dumps(dict(
+            session_config_name=Constants.name_in_url, num_participants=num_participants
+        )).encode(),
+        headers={'otree-rest-key': rest_key or '', 'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', default='http://localhost:8000')
+    parser.add_argument('--participants', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--rest-key', default=None)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args(argv)
+
+    session = create_session(args.server, args.participants, args.rest_key)
+    session_wide_url = session['session_wide_url']
+    start_urls = [
+        f"{session_wide_url}?participant_label=loadbot_{i}" for i in range(args.participants)
+    ]
+
+    recorder = LatencyRecorder()
+    failures = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_participant, url, recorder, args.timeout) for url in start_urls]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failures.append(e)
+    wall_time = time.perf_counter() - started
+
+    print(f"session {session['code']}: {args.participants} participants, concurrency {args.concurrency}")
+    print(recorder.report(wall_time))
+    if failures:
+        print(f"{len(failures)} participants failed, first error: {failures[0]!r}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
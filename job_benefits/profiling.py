@@ -0,0 +1,188 @@
+"""
+Opt-in timing for the job_benefits page and subsession hooks.
+
+Set JOB_BENEFITS_PROFILE=1 to wrap vars_for_template, is_displayed,
+get_form_fields and creating_session on every class decorated with @profiled.
+Each call records wall time and the number of SQL statements it issued into
+in-memory histograms. The p50/p95/p99 table is logged at shutdown and, if
+JOB_BENEFITS_PROFILE_PORT is set, served on http://127.0.0.1:<port>/
+(append ?format=json for machine-readable output).
+
+With the variable unset, @profiled returns the class untouched, so there is
+no overhead in normal runs.
+"""
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('JOB_BENEFITS_PROFILE', '') not in ('', '0')
+PROFILED_METHODS = ('vars_for_template', 'is_displayed', 'get_form_fields', 'creating_session')
+
+# Log-spaced bucket upper bounds in ms: 0.01ms up to ~5s, then an overflow bucket
+BUCKET_BOUNDS_MS = [0.01 * 1.25 ** i for i in range(60)]
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, capped at the largest value seen."""
+        if not self.count:
+            return 0.0
+        target = pct / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(BUCKET_BOUNDS_MS[index], self.max) if index < len(BUCKET_BOUNDS_MS) else self.max
+        return self.max
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wall_ms = {}
+        self.queries = {}
+
+    def add(self, key, wall_ms, queries):
+        with self.lock:
+            self.wall_ms.setdefault(key, Histogram()).add(wall_ms)
+            if queries is not None:
+                self.queries.setdefault(key, Histogram()).add(queries)
+
+    def clear(self):
+        with self.lock:
+            self.wall_ms.clear()
+            self.queries.clear()
+
+    def summary(self):
+        with self.lock:
+            rows = []
+            for key in sorted(self.wall_ms):
+                wall = self.wall_ms[key]
+                queries = self.queries.get(key)
+                rows.append(dict(
+                    name=key,
+                    calls=wall.count,
+                    p50_ms=wall.percentile(50),
+                    p95_ms=wall.percentile(95),
+                    p99_ms=wall.percentile(99),
+                    max_ms=wall.max,
+                    mean_queries=queries.total / queries.count if queries else None,
+                    max_queries=queries.max if queries else None,
+                ))
+            return rows
+
+
+STATS = _Stats()
+_query_counter = threading.local()
+_started = False
+_COUNTING_QUERIES = False
+
+
+def _count_query(*args, **kwargs):
+    _query_counter.value = getattr(_query_counter, 'value', 0) + 1
+
+
+def _install_query_counter():
+    """Counts statements on oTree's SQLAlchemy engine. Returns False if it isn't importable."""
+    try:
+        from sqlalchemy import event
+        from otree.database import engine
+    except ImportError:
+        logger.warning("job_benefits profiling: SQLAlchemy engine not found, query counts disabled")
+        return False
+    event.listen(engine, 'before_cursor_execute', _count_query)
+    return True
+
+
+def _wrap(key, func, count_queries):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        queries_before = getattr(_query_counter, 'value', 0)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            queries = getattr(_query_counter, 'value', 0) - queries_before if count_queries else None
+            STATS.add(key, wall_ms, queries)
+    return wrapper
+
+
+def profiled(cls):
+    """Class decorator: wraps the PROFILED_METHODS the class defines, if profiling is enabled."""
+    if not ENABLED:
+        return cls
+    _start()
+    for name in PROFILED_METHODS:
+        if name in cls.__dict__:
+            setattr(cls, name, _wrap(f'{cls.__name__}.{name}', cls.__dict__[name], _COUNTING_QUERIES))
+    return cls
+
+
+def format_summary(rows):
+    lines = [f"{'hook':<38}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'queries':>9}"]
+    for row in rows:
+        queries = '-' if row['mean_queries'] is None else f"{row['mean_queries']:.1f}"
+        lines.append(
+            f"{row['name']:<38}{row['calls']:>7}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+            f"{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}{queries:>9}"
+        )
+    return '\n'.join(lines)
+
+
+class _ReportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        rows = STATS.summary()
+        if 'format=json' in self.path:
+            body, content_type = json.dumps(rows).encode(), 'application/json'
+        else:
+            body, content_type = format_summary(rows).encode(), 'text/plain; charset=utf-8'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start():
+    global _started, _COUNTING_QUERIES
+    if _started:
+        return
+    _started = True
+    _COUNTING_QUERIES = _install_query_counter()
+    atexit.register(lambda: logger.warning("job_benefits profile:\n%s", format_summary(STATS.summary())))
+    port = os.environ.get('JOB_BENEFITS_PROFILE_PORT')
+    if port:
+        try:
+            server = ThreadingHTTPServer(('127.0.0.1', int(port)), _ReportHandler)
+        except OSError as e:
+            # e.g. the second prodserver process; the first one already serves the report
+            logger.warning("job_benefits profile report not served on port %s: %s", port, e)
+            return
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.warning("job_benefits profile report on http://127.0.0.1:%s/", port)
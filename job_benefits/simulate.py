@@ -0,0 +1,364 @@
+"""
+Monte Carlo simulator of the design, for power analysis before a wave. It
+generates synthetic participants and runs them through the app's own logic:
+the creating_session assignment (build_assignment, the Williams orders and the
+perk schedule, by id_in_subsession) and the package tiers of
+build_job_packages(), via its vectorized counterpart in batch.py.
+
+    python -m job_benefits.simulate --participants 2000000 --session-size 30
+    python -m job_benefits.simulate --wtp-median 800 --json wave3.json
+
+The work is split into chunks of whole sessions that run in a process pool.
+Every chunk draws from its own child of --seed, so the results depend only
+on --seed and --chunk-size, not on how many workers run. Each chunk returns
+counts and histograms, which are summed. Before the pool starts, a sample of
+participants is checked against build_job_packages() itself.
+
+Input model (per participant, independent):
+    willingness_to_pay_gym/bike   0 with probability --wtp-zero, otherwise
+                                  lognormal(--wtp-median, --wtp-sigma), rounded
+                                  and clipped to the form's 0..10000
+    preferred_salary              lognormal(--salary-median, --salary-sigma), rounded
+    chosen_job_tile               uniform over the catalog's jobs; blank with
+                                  probability --missing-tile
+    benefit_ranking               Plackett-Luce over the catalog's benefits with
+                                  --benefit-weights (uniform by default).
+                                  With probability --partial-ranking, only a
+                                  uniform 0..n-1 of the benefits are kept, as in
+                                  rows stored before the ranking was validated
+
+Reported:
+    cell balance       participants per treatment order x perk, over the wave and
+                       within one session
+    tier salaries      percentiles of each package's wage, how often the
+                       max(0, salary - WTP) clamp sets the lowest tier to 0, and
+                       how often the < 4 ranking fallback leaves no packages
+    choice sets        flat wages (no WTP), repeated benefits, the generic job
+                       title, the wage spread and how often each benefit is offered
+
+NumPy is needed, as for batch.py.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import (
+    CATALOG,
+    Constants,
+    assigned_perk,
+    assigned_treatment_order,
+    build_assignment,
+    encode_ranking,
+    williams_design,
+)
+from .batch import MISSING, build_job_packages_batch, check_against_scalar
+
+# Wage histograms: bins of WAGE_BIN up to WAGE_CAP, plus one overflow bin
+WAGE_BIN = 10
+WAGE_CAP = 100_000
+NUM_WAGE_BINS = WAGE_CAP // WAGE_BIN + 1
+WTP_MAX = 10000
+PERCENTILES = (5, 25, 50, 75, 95)
+# Participants compared with build_job_packages() before the run
+CHECK_SAMPLE = 2000
+
+ORDERS = williams_design(len(Constants.TREATMENTS))
+ORDER_INDEX = {tuple(order): i for i, order in enumerate(ORDERS)}
+
+
+def draw_participants(rng, n, params):
+    """Round-1 inputs for n synthetic participants, as arrays for build_job_packages_batch()."""
+    def wtp():
+        values = np.round(rng.lognormal(math.log(params['wtp_median']), params['wtp_sigma'], n))
+        values[rng.random(n) < params['wtp_zero']] = 0
+        return np.clip(values, 0, WTP_MAX)
+
+    wtp_gym, wtp_bike = wtp(), wtp()
+    salary = np.round(rng.lognormal(math.log(params['salary_median']), params['salary_sigma'], n))
+
+    tiles = rng.integers(0, len(CATALOG.jobs), n)
+    tiles[rng.random(n) < params['missing_tile']] = MISSING
+
+    # Plackett-Luce: sort by log weight plus Gumbel noise, best first
+    num_benefits = len(CATALOG.benefit_names)
+    keys = np.log(params['benefit_weights']) + rng.gumbel(size=(n, num_benefits))
+    rankings = np.argsort(-keys, axis=1)
+    partial = rng.random(n) < params['partial_ranking']
+    kept = rng.integers(0, num_benefits, n)
+    rankings[partial[:, None] & (np.arange(num_benefits) >= kept[:, None])] = MISSING
+    return dict(wtp_gym=wtp_gym, wtp_bike=wtp_bike, salary=salary, tiles=tiles, rankings=rankings)
+
+
+def session_cells(assignment, session_size):
+    """(orders, perks) count matrix of one session, filled as creating_session does."""
+    counts = np.zeros((len(ORDERS), len(Constants.NON_MONETARY_PERKS)), dtype=np.int64)
+    num_orders = len(assignment['orders'])
+    perk_offset = assignment['perk_offset']
+    for position in range(num_orders):
+        order_index = ORDER_INDEX[tuple(assignment['orders'][position])]
+        # ids position+1, position+1+num_orders, ...; the perk advances once per pass
+        passes = np.arange(len(range(position, session_size, num_orders)))
+        np.add.at(counts[order_index], (passes + perk_offset) % counts.shape[1], 1)
+    return counts
+
+
+def empty_summary():
+    num_benefits = len(CATALOG.benefit_names)
+    return dict(
+        participants=0,
+        sessions=0,
+        cells=np.zeros((len(ORDERS), len(Constants.NON_MONETARY_PERKS)), dtype=np.int64),
+        session_imbalance=np.zeros(0, dtype=np.int64),
+        valid=0,
+        fallback=0,
+        clamped=0,
+        flat=0,
+        repeated_benefit=0,
+        general_title=0,
+        wage_hist=np.zeros((4, NUM_WAGE_BINS), dtype=np.int64),
+        wage_max=np.zeros(4, dtype=np.int64),
+        spread_hist=np.zeros(NUM_WAGE_BINS, dtype=np.int64),
+        spread_max=0,
+        benefit_offered=np.zeros(num_benefits, dtype=np.int64),
+    )
+
+
+def merge(total, part):
+    for key, value in part.items():
+        if key.endswith('_max'):
+            total[key] = np.maximum(total[key], value)
+        elif key == 'session_imbalance':
+            # Histograms of different lengths
+            merged = np.zeros(max(len(total[key]), len(value)), dtype=np.int64)
+            merged[:len(total[key])] += total[key]
+            merged[:len(value)] += value
+            total[key] = merged
+        else:
+            total[key] = total[key] + value
+    return total
+
+
+def wage_bins(wages):
+    return np.bincount(np.minimum(wages // WAGE_BIN, NUM_WAGE_BINS - 1), minlength=NUM_WAGE_BINS)
+
+
+def simulate_chunk(task):
+    """Summary of num_sessions synthetic sessions; task is (seed, num_sessions, session_size, params)."""
+    seed, num_sessions, session_size, params = task
+    rng = np.random.default_rng(seed)
+    summary = empty_summary()
+
+    imbalance = []
+    for _ in range(num_sessions):
+        counts = session_cells(build_assignment(int(rng.integers(2 ** 32))), session_size)
+        summary['cells'] += counts
+        imbalance.append(counts.max() - counts.min())
+    summary['session_imbalance'] = np.bincount(imbalance)
+    summary['sessions'] = num_sessions
+
+    n = num_sessions * session_size
+    inputs = draw_participants(rng, n, params)
+    wtp_sum = inputs['wtp_gym'] + inputs['wtp_bike']
+    batch = build_job_packages_batch(inputs['salary'], wtp_sum, inputs['tiles'], inputs['rankings'])
+    valid = batch['valid']
+    wage = batch['wage'][valid]
+    salary = np.where(inputs['salary'] == 0, Constants.BASE_SALARY, inputs['salary'])[valid]
+    benefit_index = batch['benefit_index'][valid]
+
+    summary['participants'] = n
+    summary['valid'] = int(valid.sum())
+    summary['fallback'] = n - summary['valid']
+    summary['clamped'] = int((salary < wtp_sum[valid]).sum())
+    summary['flat'] = int((wtp_sum[valid] == 0).sum())
+    summary['general_title'] = int((batch['title_index'][valid] == MISSING).sum())
+    sorted_benefits = np.sort(benefit_index, axis=1)
+    summary['repeated_benefit'] = int((sorted_benefits[:, 1:] == sorted_benefits[:, :-1]).any(axis=1).sum())
+    for tier in range(4):
+        summary['wage_hist'][tier] = wage_bins(wage[:, tier])
+    summary['wage_max'] = wage.max(axis=0) if len(wage) else summary['wage_max']
+    spread = wage[:, 0] - wage[:, 3]
+    summary['spread_hist'] = wage_bins(spread)
+    summary['spread_max'] = int(spread.max()) if len(spread) else 0
+    # A benefit counts once per choice set, even if it fills two tiers
+    offered = np.zeros((len(benefit_index), len(CATALOG.benefit_names)), dtype=bool)
+    offered[np.arange(len(benefit_index))[:, None], benefit_index] = True
+    summary['benefit_offered'] = offered.sum(axis=0)
+    return summary
+
+
+def check_sample(params, seed):
+    """Compares CHECK_SAMPLE synthetic participants against build_job_packages() and the assignment helpers."""
+    rng = np.random.default_rng(seed)
+    inputs = draw_participants(rng, CHECK_SAMPLE, params)
+    ranking_strs = [
+        encode_ranking([CATALOG.benefit_names[i] for i in row if i != MISSING]) for row in inputs['rankings']
+    ]
+    check_against_scalar(
+        ranking_strs,
+        [int(s) for s in inputs['salary']],
+        [int(w) for w in inputs['wtp_gym']],
+        [int(w) for w in inputs['wtp_bike']],
+        [None if t == MISSING else int(t) for t in inputs['tiles']],
+    )
+
+    assignment = build_assignment(int(rng.integers(2 ** 32)))
+    session_size = 2 * len(ORDERS) + 1
+    expected = np.zeros((len(ORDERS), len(Constants.NON_MONETARY_PERKS)), dtype=np.int64)
+    for id_in_subsession in range(1, session_size + 1):
+        order = [Constants.TREATMENTS.index(t) for t in assigned_treatment_order(assignment, id_in_subsession)]
+        perk = Constants.NON_MONETARY_PERKS.index(assigned_perk(assignment, id_in_subsession))
+        expected[ORDER_INDEX[tuple(order)], perk] += 1
+    assert (session_cells(assignment, session_size) == expected).all(), "session_cells() disagrees with creating_session"
+
+
+def run(num_participants, session_size, chunk_size, workers, seed, params):
+    """Summary of a simulated wave of about num_participants, rounded up to whole sessions."""
+    num_sessions = math.ceil(num_participants / session_size)
+    sessions_per_chunk = max(1, chunk_size // session_size)
+    chunk_sessions = [
+        min(sessions_per_chunk, num_sessions - start) for start in range(0, num_sessions, sessions_per_chunk)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sessions))
+    tasks = [(child, sessions, session_size, params) for child, sessions in zip(seeds, chunk_sessions)]
+
+    total = empty_summary()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(simulate_chunk, tasks):
+            merge(total, part)
+    return total
+
+
+def hist_percentile(hist, pct, largest):
+    """Upper bound of the bin holding the pct-th percentile, capped at the largest value seen."""
+    target = hist.sum() * pct / 100
+    index = int(np.searchsorted(np.cumsum(hist), target))
+    return min((index + 1) * WAGE_BIN, int(largest))
+
+
+def order_label(order):
+    return ' > '.join(Constants.TREATMENTS[i] for i in order)
+
+
+def report(summary):
+    """Plain-data version of a summary (for --json) and its text rendering."""
+    n = summary['participants']
+    valid = summary['valid']
+
+    cells = []
+    for i, order in enumerate(ORDERS):
+        for j, perk in enumerate(Constants.NON_MONETARY_PERKS):
+            count = int(summary['cells'][i, j])
+            cells.append(dict(order=order_label(order), perk=perk, participants=count, share=count / n))
+    tiers = []
+    for tier in range(4):
+        hist = summary['wage_hist'][tier]
+        tiers.append(dict(
+            package_index=tier,
+            mean=float((np.arange(NUM_WAGE_BINS) * WAGE_BIN + WAGE_BIN / 2) @ hist / max(1, hist.sum())),
+            **{f'p{pct}': hist_percentile(hist, pct, summary['wage_max'][tier]) for pct in PERCENTILES},
+        ))
+    data = dict(
+        participants=n,
+        sessions=summary['sessions'],
+        cells=cells,
+        session_imbalance={str(k): int(v) for k, v in enumerate(summary['session_imbalance']) if v},
+        tiers=tiers,
+        fallback_rate=summary['fallback'] / n,
+        clamp_rate=summary['clamped'] / max(1, valid),
+        choice_sets=dict(
+            flat_wages=summary['flat'] / max(1, valid),
+            repeated_benefit=summary['repeated_benefit'] / max(1, valid),
+            general_position=summary['general_title'] / max(1, valid),
+            wage_spread={
+                f'p{pct}': hist_percentile(summary['spread_hist'], pct, summary['spread_max']) for pct in PERCENTILES
+            },
+            benefit_offered={
+                name: int(count) / max(1, valid) for name, count in zip(CATALOG.benefit_names, summary['benefit_offered'])
+            },
+        ),
+    )
+
+    lines = [f"{n} participants in {summary['sessions']} sessions", '', 'Cells (treatment order x perk)']
+    lines += [f"  {c['order']:<46}{c['perk']:<18}{c['participants']:>10}{c['share']:>9.2%}" for c in cells]
+    lines.append('  max - min cell count within a session: ' + ', '.join(
+        f"{k} in {v} sessions" for k, v in data['session_imbalance'].items()
+    ))
+    lines += ['', 'Tier salaries (choice sets shown)', f"  {'package':<10}{'mean':>9}" + ''.join(f"{f'p{p}':>9}" for p in PERCENTILES)]
+    lines += [
+        f"  {t['package_index']:<10}{t['mean']:>9.0f}" + ''.join(f"{t[f'p{p}']:>9}" for p in PERCENTILES) for t in tiers
+    ]
+    lines.append(f"  max(0, salary - WTP) clamp sets package 3 to 0: {data['clamp_rate']:.2%}")
+    lines.append(f"  ranking fallback (< 4 ranked, no packages):    {data['fallback_rate']:.2%}")
+    sets = data['choice_sets']
+    lines += [
+        '', 'Choice sets',
+        f"  flat wages (WTP 0):        {sets['flat_wages']:.2%}",
+        f"  a benefit in two packages: {sets['repeated_benefit']:.2%}",
+        f"  'General Position' title:  {sets['general_position']:.2%}",
+        '  wage spread (package 0 - 3): ' + ', '.join(f"p{p} {sets['wage_spread'][f'p{p}']}" for p in PERCENTILES),
+        '  benefit offered in:',
+    ]
+    lines += [f"    {name:<28}{share:>8.2%}" for name, share in sets['benefit_offered'].items()]
+    return data, '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=1_000_000)
+    parser.add_argument('--session-size', type=int, default=30)
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='participants per task, rounded to whole sessions')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--wtp-median', type=float, default=300)
+    parser.add_argument('--wtp-sigma', type=float, default=1.0)
+    parser.add_argument('--wtp-zero', type=float, default=0.1)
+    parser.add_argument('--salary-median', type=float, default=Constants.BASE_SALARY)
+    parser.add_argument('--salary-sigma', type=float, default=0.4)
+    parser.add_argument('--missing-tile', type=float, default=0.0)
+    parser.add_argument('--partial-ranking', type=float, default=0.0)
+    parser.add_argument('--benefit-weights', help='comma-separated, in catalog order (default: uniform)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    for name in ('participants', 'session_size', 'chunk_size', 'workers'):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    num_benefits = len(CATALOG.benefit_names)
+    weights = [float(w) for w in args.benefit_weights.split(',')] if args.benefit_weights else [1.0] * num_benefits
+    if len(weights) != num_benefits or min(weights) <= 0:
+        parser.error(f"--benefit-weights needs {num_benefits} positive numbers: {', '.join(CATALOG.benefit_names)}")
+    if args.wtp_median <= 0 or args.salary_median <= 0:
+        parser.error("--wtp-median and --salary-median must be positive")
+    params = dict(
+        wtp_median=args.wtp_median,
+        wtp_sigma=args.wtp_sigma,
+        wtp_zero=args.wtp_zero,
+        salary_median=args.salary_median,
+        salary_sigma=args.salary_sigma,
+        missing_tile=args.missing_tile,
+        partial_ranking=args.partial_ranking,
+        benefit_weights=np.asarray(weights),
+    )
+
+    check_sample(params, args.seed)
+    started = time.perf_counter()
+    summary = run(args.participants, args.session_size, args.chunk_size, args.workers, args.seed, params)
+    data, text = report(summary)
+    print(text)
+    print(f"\n{time.perf_counter() - started:.1f} s with {args.workers} workers")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(data, seed=args.seed, session_size=args.session_size, params=dict(
+                params, benefit_weights=weights
+            )), f, indent=2)
+        print(f"results saved to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
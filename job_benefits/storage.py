@@ -0,0 +1,81 @@
+"""
+Database tuning profiles for the engine oTree creates from DATABASE_URL.
+
+oTree 5 ignores a DATABASES block in settings.py, so the profile is applied
+to oTree's SQLAlchemy engine when the app is imported. Select it with
+JOB_BENEFITS_STORAGE_PROFILE:
+
+    auto (default)  'lab' on SQLite, 'off' otherwise
+    lab             SQLite: WAL journal, synchronous=NORMAL, busy timeout,
+                    larger page cache
+    off             leave the engine as oTree configured it
+
+Only SQLite is tuned. oTree gives each server process one shared connection
+(a StaticPool), on PostgreSQL too, so there is no connection pool to size.
+
+storage_benchmark.py measures the profile against the defaults.
+"""
+import logging
+import os
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+STORAGE_PROFILES = {
+    'lab': dict(
+        dialect='sqlite',
+        pragmas=dict(
+            journal_mode='WAL',
+            # Safe with WAL: a power loss can lose the last commits, never corrupt the file
+            synchronous='NORMAL',
+            busy_timeout=5000,
+            cache_size=-64000,  # 64 MB
+            temp_store='MEMORY',
+        ),
+    ),
+}
+DIALECT_DEFAULTS = {'sqlite': 'lab'}
+
+
+def resolve_profile_name(engine, name):
+    if name == 'auto':
+        return DIALECT_DEFAULTS.get(engine.dialect.name, 'off')
+    if name != 'off' and name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{name}', expected auto, off or one of {sorted(STORAGE_PROFILES)}")
+    return name
+
+
+def apply_storage_profile(engine, name):
+    """Tunes engine in place and returns the name of the profile applied ('off' if none)."""
+    name = resolve_profile_name(engine, name)
+    if name == 'off':
+        return name
+    profile = STORAGE_PROFILES[name]
+    if engine.dialect.name != profile['dialect']:
+        logger.warning("Storage profile '%s' is for %s, not %s; skipped", name, profile['dialect'], engine.dialect.name)
+        return 'off'
+    if profile['dialect'] == 'sqlite' and engine.url.database in (None, '', ':memory:'):
+        # An in-memory database lives in a single connection; nothing to tune
+        return 'off'
+
+    # Runs when the pool first opens its connection, before oTree's first query
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in profile['pragmas'].items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+        cursor.close()
+    return name
+
+
+def apply_from_environment():
+    """Applies JOB_BENEFITS_STORAGE_PROFILE to oTree's engine; called once at app import."""
+    try:
+        from otree.database import engine
+    except ImportError:
+        logger.warning("job_benefits storage profile: oTree's SQLAlchemy engine not found, skipped")
+        return 'off'
+    name = apply_storage_profile(engine, os.environ.get('JOB_BENEFITS_STORAGE_PROFILE', 'auto'))
+    logger.info("job_benefits storage profile: %s", name)
+    return name
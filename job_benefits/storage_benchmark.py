@@ -0,0 +1,170 @@
+"""
+Storage backend benchmark: a synthetic SQL replay of the bot workload's writes
+against SQLite and PostgreSQL, through an engine built the way oTree's
+get_engine() builds it, with and without the SQLite profile from storage.py.
+
+It does not run oTree or the PlayerBot. Each simulated participant submits the
+pages PlayerBot in tests.py submits (ValuePerception, JobPreference,
+BenefitRanking, then JobOffer per treatment and JobSelection), with random
+values like the bot's. Each submit runs, in one transaction, an approximation
+of the statements oTree issues for a page POST: load the participant and player
+rows, update the player's fields, and advance the participant's page index.
+Page rendering, oTree's ORM and its other tables are left out, so the numbers
+compare backends and settings, not a full server. Tables mirror the columns
+involved and are created in the target database, so point it at scratch
+databases:
+
+    python -m job_benefits.storage_benchmark --participants 500 \\
+        --sqlite /tmp/bench.sqlite3 --postgres postgresql://localhost/otree_bench
+
+oTree serves every request of a server process on one shared connection (a
+StaticPool), so the submits run one after another on a single connection,
+with all participants advancing page by page as a full lab would. The result
+is the submit rate one server process can sustain on the database alone.
+Reports submits/s and per-page p50/p95/p99 latency for each backend/profile.
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from . import CATALOG, SINGLE_ROUND, Constants, encode_ranking
+from .loadtest import LatencyRecorder
+from .storage import apply_storage_profile
+
+SCHEMA = [
+    'DROP TABLE IF EXISTS bench_player',
+    'DROP TABLE IF EXISTS bench_participant',
+    'CREATE TABLE bench_participant (id INTEGER PRIMARY KEY, code VARCHAR(16) UNIQUE, _index_in_pages INTEGER)',
+    '''CREATE TABLE bench_player (
+        id INTEGER PRIMARY KEY, participant_id INTEGER REFERENCES bench_participant(id), round_number INTEGER,
+        willingness_to_pay_gym REAL, willingness_to_pay_bike REAL, chosen_job_tile INTEGER,
+        preferred_salary REAL, benefit_ranking VARCHAR(36), treatment VARCHAR(32), accept_offer BOOLEAN,
+        gym_choice VARCHAR(8), bike_choice VARCHAR(8), chosen_job_package_index INTEGER, modal_time_log TEXT
+    )''',
+    'CREATE INDEX bench_player_participant ON bench_player (participant_id, round_number)',
+]
+
+
+def bot_submissions():
+    """(page name, round, fields) in the order PlayerBot submits them, with random valid values."""
+    ranking = list(CATALOG.benefit_names)
+    random.shuffle(ranking)
+    yield 'ValuePerception', 1, dict(
+        willingness_to_pay_gym=random.randint(0, 1500), willingness_to_pay_bike=random.randint(0, 1500)
+    )
+    yield 'JobPreference', 1, dict(
+        chosen_job_tile=random.randrange(len(CATALOG.jobs)), preferred_salary=random.randint(2000, 6000)
+    )
+    yield 'BenefitRanking', 1, dict(benefit_ranking=encode_ranking(ranking))
+    for step in range(1, len(Constants.TREATMENTS) + 1):
+        # Single-round mode writes every step to the round-1 row
+        yield 'JobOffer', 1 if SINGLE_ROUND else step, dict(
+            accept_offer=random.choice([True, False]),
+            gym_choice=random.choice(['Cash', 'Benefit', 'Reject']),
+            bike_choice=random.choice(['Cash', 'Benefit', 'Reject']),
+        )
+    yield 'JobSelection', Constants.num_rounds, dict(
+        chosen_job_package_index=random.randrange(4), modal_time_log='{"Tile Index 0": 1234}'
+    )
+
+
+def setup_database(engine, num_participants):
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(
+            text('INSERT INTO bench_participant (id, code, _index_in_pages) VALUES (:id, :code, 0)'),
+            [dict(id=i, code=f'bench{i}') for i in range(1, num_participants + 1)],
+        )
+        conn.execute(
+            text('INSERT INTO bench_player (id, participant_id, round_number, treatment) VALUES (:id, :pid, :r, :t)'),
+            [
+                dict(id=(i - 1) * Constants.num_rounds + r, pid=i, r=r, t=Constants.TREATMENTS[r - 1])
+                for i in range(1, num_participants + 1)
+                for r in range(1, Constants.num_rounds + 1)
+            ],
+        )
+
+
+def otree_engine(url):
+    """An engine configured like oTree's get_engine(): one shared connection, foreign keys on in SQLite."""
+    if not url.startswith('sqlite'):
+        return create_engine(url, poolclass=StaticPool)
+    conn = sqlite3.connect(url[len('sqlite:///'):], check_same_thread=False)
+    engine = create_engine(url, creator=lambda: conn, poolclass=StaticPool)
+    event.listen(engine, 'connect', lambda c, _: c.execute('pragma foreign_keys=on'))
+    return engine
+
+
+def submit(engine, participant_id, round_number, fields):
+    assignments = ', '.join(f'{name} = :{name}' for name in fields)
+    with engine.begin() as conn:
+        conn.execute(
+            text('SELECT id, code, _index_in_pages FROM bench_participant WHERE id = :pid'),
+            dict(pid=participant_id),
+        ).fetchone()
+        player_id = conn.execute(
+            text('SELECT id FROM bench_player WHERE participant_id = :pid AND round_number = :r'),
+            dict(pid=participant_id, r=round_number),
+        ).scalar()
+        conn.execute(text(f'UPDATE bench_player SET {assignments} WHERE id = :id'), dict(fields, id=player_id))
+        conn.execute(
+            text('UPDATE bench_participant SET _index_in_pages = _index_in_pages + 1 WHERE id = :pid'),
+            dict(pid=participant_id),
+        )
+
+
+def run_case(label, url, profile, args):
+    engine = otree_engine(url)
+    applied = apply_storage_profile(engine, profile) if profile else 'default'
+    if url.startswith('sqlite') and not profile:
+        # WAL is stored in the file, so a previous 'lab' run would leave the baseline in WAL
+        with engine.connect() as conn:
+            conn.execute(text('PRAGMA journal_mode=DELETE'))
+    setup_database(engine, args.participants)
+
+    # Page by page across all participants
+    pages = list(zip(*(bot_submissions() for _ in range(args.participants))))
+    recorder = LatencyRecorder()
+    started = time.perf_counter()
+    for page in pages:
+        for participant_id, (page_name, round_number, fields) in enumerate(page, start=1):
+            submit_started = time.perf_counter()
+            submit(engine, participant_id, round_number, fields)
+            recorder.add(f'{page_name} submit', time.perf_counter() - submit_started)
+    wall_time = time.perf_counter() - started
+    engine.dispose()
+
+    submits = sum(len(v) for v in recorder.samples.values())
+    print(f'\n=== {label} ({applied}): {submits / wall_time:.0f} submits/s')
+    print(recorder.report(wall_time))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=300)
+    parser.add_argument('--sqlite', help='path of a scratch SQLite file')
+    parser.add_argument('--postgres', help='URL of a scratch PostgreSQL database')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if not (args.sqlite or args.postgres):
+        parser.error('give --sqlite and/or --postgres')
+
+    random.seed(args.seed)
+    cases = []
+    if args.sqlite:
+        url = f'sqlite:///{args.sqlite}'
+        cases += [('sqlite', url, None), ('sqlite', url, 'lab')]
+    if args.postgres:
+        # storage.py has no PostgreSQL profile; this is the backend comparison
+        cases.append(('postgres', args.postgres, None))
+    for label, url, profile in cases:
+        run_case(label, url, profile, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+from otree.api import Currency as c, currency_range, expect, Bot, Submission
+from . import *
+import json
+import random
+
+
+# Randomized but valid inputs, shared with the load harness in loadtest.py
+
+def random_value_perception():
+    return dict(
+        willingness_to_pay_gym=random.randint(0, 1500),
+        willingness_to_pay_bike=random.randint(0, 1500),
+    )
+
+
+def random_job_preference():
+    return dict(
+        chosen_job_tile=random.randrange(len(CATALOG.jobs)),
+        preferred_salary=random.randint(2000, 6000),
+    )
+
+
+def random_benefit_ranking():
+    ranking = list(CATALOG.benefit_names)
+    random.shuffle(ranking)
+    return dict(benefit_ranking=encode_ranking(ranking))
+
+
+def random_job_offer(treatment):
+    if treatment == 'Choice':
+        return dict(
+            gym_choice=random.choice(['Cash', 'Benefit', 'Reject']),
+            bike_choice=random.choice(['Cash', 'Benefit', 'Reject']),
+        )
+    return {offer_form_fields(treatment)[0]: random.choice([True, False])}
+
+
+def random_job_selection():
+    # Synthetic modal_time_log in the format JobSelection.html submits
+    opened_tiles = random.sample(range(4), random.randint(1, 4))
+    time_log = {f'Tile Index {i}': random.randint(200, 20000) for i in opened_tiles}
+    return dict(
+        chosen_job_package_index=random.choice(opened_tiles),
+        modal_time_log=json.dumps(time_log),
+    )
+
+
+def check_batch_packages(num_players=2000):
+    # The vectorized generator must match build_job_packages, edge cases included.
+    # It needs NumPy, which the live app doesn't.
+    try:
+        from . import batch
+    except ImportError:
+        return
+    batch.check_against_scalar(*batch.random_inputs(random.Random(0), num_players))
+    try:
+        batch.encode_rankings(['Not A Benefit,' + ','.join(CATALOG.benefit_names)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("encode_rankings accepted a benefit that isn't in the catalog")
+
+
+class PlayerBot(Bot):
+    def play_round(self):
+        if self.round_number == 1:
+            yield Introduction
+            yield ValuePerception, random_value_perception()
+            yield JobPreference, random_job_preference()
+            yield BenefitRanking, random_benefit_ranking()
+
+        if SINGLE_ROUND:
+            for step, page in enumerate([JobOffer, JobOffer2, JobOffer3], start=1):
+                yield page, random_job_offer(offer_treatment(self.player, step))
+        else:
+            yield JobOffer, random_job_offer(self.player.treatment)
+
+        if self.round_number == Constants.num_rounds:
+            packages = self.player.get_dynamic_job_packages()
+            expect(len(packages), 4)
+            selection = random_job_selection()
+            if self.participant.id_in_session == 1:
+                # Valid JSON but not a per-tile object: rejected, not passed on to the export
+                selection['modal_time_log'] = '[]'
+            yield JobSelection, selection
+            # Last page: it has no next button to click
+            yield Submission(ResultsSummary, check_html=False)
+            if self.participant.id_in_session == 1:
+                check_batch_packages()
+                expect(recorded_dwell_times(self.player), None)
+                expect(len(list(custom_export(self.player.in_all_rounds()))), 2)
+
+
+def call_live_method(method, group, **kwargs):
+    # oTree 6 hands bots `method` as an async generator that nothing iterates,
+    # so the page's live_method is called directly
+    player = group.get_player_by_id(1)
+    # JobSelection telemetry: one batch with an open/close pair and a malformed entry
+    JobSelection.live_method(player, {'events': [['h', 2, 50], ['o', 2, 100], ['c', 2, 1600], ['x', 9, -1]]})
+    # Over the per-message cap: dropped whole
+    JobSelection.live_method(player, {'events': [['h', 0, 0]] * (MAX_TILE_EVENTS_PER_BATCH + 1)})
+    events = [(e.kind, e.tile, e.t_ms) for e in TileEvent.filter(player=player)]
+    expect(events, [('h', 2, 50), ('o', 2, 100), ('c', 2, 1600)])
+    expect(summarize_tile_events(events), {'Tile Index 2': 1500})
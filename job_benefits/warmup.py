@@ -0,0 +1,150 @@
+"""
+Warms up the web server process before it takes traffic. Enabled with
+JOB_BENEFITS_WARMUP=1, which the Procfile sets for the web process.
+
+At app import this registers a startup handler on oTree's ASGI app. uvicorn
+runs it in the server process after oTree has set up the database and before
+it binds the port, so no participant request can arrive in the meantime:
+
+    pages      a throwaway session played by the app's PlayerBot through every
+               page in page_sequence, JobSelection and ResultsSummary in the
+               final round included, with oTree's in-process test client. The
+               session lives in a scratch in-memory database that oTree's ORM
+               is bound to only while it runs; the results snapshot is paused.
+    database   oTree's one shared connection opened (applying the storage
+               profile's PRAGMAs) and queried once
+    pyarrow    imported, if the results snapshot is enabled
+
+Rendering the pages compiles their templates into oTree's cache and runs each
+page's vars_for_template, is_displayed and before_next_page code once (catalog,
+snapshot, package cache, session stats, telemetry). Each stage and page is
+timed in the log. A failed stage is logged and never stops the server; a page
+that fails to render fails here, in the deploy log. The pages stage needs the
+requests package, as `otree test` does.
+
+The worker process (prodserver2of2) only sleeps in oTree 5.4 and later; it
+serves no pages, so it has nothing to warm.
+"""
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('JOB_BENEFITS_WARMUP', '') not in ('', '0')
+APP_NAME = 'job_benefits'
+
+
+def current_page(bot):
+    """Page the bot is on, from its URL (/p/<code>/job_benefits/<Page>/<index>)."""
+    parts = (bot.path or '').strip('/').split('/')
+    return parts[-2] if len(parts) >= 4 else 'end'
+
+
+def session_config_name():
+    from otree.session import SESSION_CONFIGS_DICT
+
+    return next(name for name, config in SESSION_CONFIGS_DICT.items() if APP_NAME in config['app_sequence'])
+
+
+def play_session():
+    """Plays one PlayerBot participant through the app; returns {page: ms of the request that rendered it}."""
+    import otree.session
+    from otree.bots.runner import make_bots
+    # The test client needs requests, like `otree test`, and exits the process
+    # if it's missing; importing it here fails only this stage instead
+    import requests  # noqa: F401
+
+    session = otree.session.create_session(session_config_name(), num_participants=1)
+    timings = {}
+    for bot in make_bots(session_pk=session.id, case_number=0, use_browser_bots=False):
+        started = time.perf_counter()
+        bot.open_start_url()
+        timings[current_page(bot)] = (time.perf_counter() - started) * 1000
+        while True:
+            try:
+                submission = bot.get_next_submit()
+            except StopIteration:
+                break
+            started = time.perf_counter()
+            bot.submit(submission)
+            timings[current_page(bot)] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def play_session_in_new_db_session():
+    from otree.database import db
+
+    db.new_session()
+    try:
+        return play_session()
+    finally:
+        db.close()
+
+
+def render_pages():
+    """play_session() against a scratch in-memory database, leaving the real one untouched."""
+    from otree.database import AnyModel, DBSession, engine
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    from . import columnar, profiling
+
+    # One connection shared with the test client's thread, like oTree's own engine
+    scratch = create_engine('sqlite://', connect_args=dict(check_same_thread=False), poolclass=StaticPool)
+    AnyModel.metadata.create_all(scratch)
+    results_dir, columnar.RESULTS_DIR = columnar.RESULTS_DIR, None
+    DBSession.configure(bind=scratch)
+    try:
+        # oTree's test client runs the app on the thread's event loop, and this
+        # one's is busy starting the server; the port isn't bound until it returns
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            timings = pool.submit(play_session_in_new_db_session).result()
+    finally:
+        DBSession.configure(bind=engine)
+        columnar.RESULTS_DIR = results_dir
+        scratch.dispose()
+        # The throwaway participant's samples would skew the per-page histograms
+        profiling.STATS.clear()
+    logger.info(
+        "job_benefits warm-up: first render per page (ms): %s",
+        ', '.join(f'{page} {ms:.1f}' for page, ms in timings.items()),
+    )
+
+
+def open_database():
+    from otree.database import engine
+    from sqlalchemy import text
+
+    # oTree's engine has a StaticPool, so this connection is the one the server keeps
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+
+
+def import_pyarrow():
+    import pyarrow  # noqa: F401
+
+
+def run_stages(results_enabled):
+    stages = [('pages', render_pages), ('database', open_database)]
+    if results_enabled:
+        stages.append(('pyarrow', import_pyarrow))
+    for name, stage in stages:
+        started = time.perf_counter()
+        try:
+            stage()
+        except Exception:
+            logger.exception("job_benefits warm-up: %s failed", name)
+            continue
+        logger.info("job_benefits warm-up: %s in %.1f ms", name, (time.perf_counter() - started) * 1000)
+
+
+def warm_up(results_enabled=False):
+    """Registers the warm-up to run at server startup if JOB_BENEFITS_WARMUP is set; called once at app import."""
+    if not ENABLED:
+        return
+    from otree.asgi import app
+
+    app.add_event_handler('startup', functools.partial(run_stages, results_enabled))
@@ -39,13 +39,9 @@ SESSION_CONFIG_DEFAULTS = dict(
 # List your apps here - usually just the names of your app folders
 OTREE_APPS = ['job_benefits']
 
-# Database (default is SQLite)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db.sqlite3'),
-    }
-}
+# Database: oTree reads DATABASE_URL (SQLite db.sqlite3 if unset) and ignores a
+# DATABASES block. Tuning is applied by job_benefits/storage.py; choose it with
+# JOB_BENEFITS_STORAGE_PROFILE=auto|lab|off (auto: lab on SQLite, off on Postgres).
 
 # Internationalization settings
 LANGUAGE_CODE = 'en-us'
@@ -0,0 +1,74 @@
+"""
+Builds the front-end bundles for job_benefits.
+
+Each page's stylesheet and script in _static/job_benefits/src/ is written with
+a content-hashed name to _static/job_benefits/dist/, together with the pinned
+SortableJS committed in _static/job_benefits/vendor/. dist/manifest.json maps
+logical names ('BenefitRanking.css', 'sortable.js') to the hashed files;
+job_benefits reads it at import. Hashed names never change content, so browsers
+can cache them indefinitely, and nothing is fetched from a CDN.
+
+Stylesheets are minified. Scripts are copied as they are: stripping JavaScript
+safely needs a real tokenizer (template literals, regex literals), which this
+build doesn't depend on.
+
+Re-run after editing anything in src/ and commit the output:
+
+    python tools/build_assets.py
+"""
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC_DIR = ROOT / '_static'
+APP_STATIC_DIR = STATIC_DIR / 'job_benefits'
+SOURCE_DIR = APP_STATIC_DIR / 'src'
+VENDOR_DIR = APP_STATIC_DIR / 'vendor'
+OUTPUT_DIR = APP_STATIC_DIR / 'dist'
+
+SORTABLE_VERSION = '1.15.2'
+SORTABLE_FILE = f'Sortable-{SORTABLE_VERSION}.js'
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(source):
+    css = CSS_COMMENT_RE.sub('', source)
+    css = ' '.join(css.split())
+    css = CSS_SPACE_RE.sub(r'\1', css)
+    # Only after property colons: a space before ':' can be a descendant combinator
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def write_hashed(stem, suffix, content):
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    out_name = f'{stem}.{digest}{suffix}'
+    (OUTPUT_DIR / out_name).write_bytes(data)
+    print(f'{out_name:<48}{len(data):>8} bytes')
+    return OUTPUT_DIR.relative_to(STATIC_DIR).joinpath(out_name).as_posix()
+
+
+def main():
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    for old in OUTPUT_DIR.iterdir():
+        old.unlink()
+
+    manifest = {}
+    for source in sorted(SOURCE_DIR.glob('*.css')):
+        manifest[source.name] = write_hashed(source.stem, '.min.css', minify_css(source.read_text()))
+    for source in sorted(SOURCE_DIR.glob('*.js')):
+        manifest[source.name] = write_hashed(source.stem, '.js', source.read_bytes())
+    manifest['sortable.js'] = write_hashed(f'Sortable-{SORTABLE_VERSION}', '.js', (VENDOR_DIR / SORTABLE_FILE).read_bytes())
+
+    (OUTPUT_DIR / 'manifest.json').write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
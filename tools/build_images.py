@@ -0,0 +1,76 @@
+"""
+Builds the responsive variants of the ValuePerception images.
+
+For each source image in _static/global/ this writes resized AVIF, WebP and JPEG
+files with content-hashed names to _static/global/img/, plus manifest.json,
+which job_benefits reads at import to render srcset attributes. Hashed names
+mean the files can be served with far-future cache headers.
+
+Needs Pillow with AVIF support (Pillow >= 11.3). Re-run after changing a source
+image and commit the output:
+
+    python tools/build_images.py
+"""
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+STATIC_DIR = ROOT / '_static'
+SOURCE_DIR = STATIC_DIR / 'global'
+OUTPUT_DIR = SOURCE_DIR / 'img'
+
+SOURCES = {
+    'gym': 'gym.jpg',
+    'work_bike': 'work_bike.jpg',
+}
+# The images sit in a ~640px column; 1280 covers it at 2x DPR
+WIDTHS = [480, 800, 1280]
+FORMATS = {
+    'avif': dict(format='AVIF', quality=50),
+    'webp': dict(format='WEBP', quality=75, method=6),
+    'jpeg': dict(format='JPEG', quality=78, optimize=True, progressive=True),
+}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+FALLBACK_WIDTH = 800
+
+
+def encode(image, options):
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def build_image(name, filename):
+    source = Image.open(SOURCE_DIR / filename).convert('RGB')
+    entry = dict(width=source.width, height=source.height, variants={})
+    for fmt, options in FORMATS.items():
+        variants = []
+        for width in WIDTHS:
+            if width > source.width:
+                continue
+            height = round(source.height * width / source.width)
+            data = encode(source.resize((width, height), Image.LANCZOS), options)
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            out_name = f'{name}-{width}.{digest}.{EXTENSIONS[fmt]}'
+            (OUTPUT_DIR / out_name).write_bytes(data)
+            variants.append([OUTPUT_DIR.relative_to(STATIC_DIR).joinpath(out_name).as_posix(), width])
+            print(f'{out_name:<40}{len(data) // 1024:>6} KB')
+        entry['variants'][fmt] = variants
+    entry['fallback'] = next(path for path, width in entry['variants']['jpeg'] if width == FALLBACK_WIDTH)
+    return entry
+
+
+def main():
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    for old in OUTPUT_DIR.iterdir():
+        old.unlink()
+    manifest = {name: build_image(name, filename) for name, filename in SOURCES.items()}
+    (OUTPUT_DIR / 'manifest.json').write_text(json.dumps(manifest, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()